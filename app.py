@@ -1,9 +1,39 @@
-import tkinter as tk
-from tkinter import messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+# tkinter and matplotlib are imported where they are first used, so the
+# module (e.g. band_vertices) loads without the UI stack.
+import numpy as np
 import re
 
+from encoding_core import SCHEMES
+from encoding_logic import EncodingLogic
+from line_stats import format_stats, format_stats_table
+from profiling import NULL_FRAME, StageProfiler, format_frame
+from waveform import grid_step
+
+# Bit boundaries closer than this (in pixels) are thinned out to every 2nd, 5th, 10th... bit
+BIT_LINE_MIN_SPACING = 6
+
+# Pseudo-scheme selecting the stacked view of every scheme at once
+ALL_SCHEMES = "All Schemes"
+
+# The statistics panel is measured once the input has been left alone for
+# this long (ms), not on every keystroke; until then it is greyed out
+STATS_DELAY_MS = 300
+
+
+def band_vertices(waveform, columns):
+    """
+    Outline of the band covering the levels the waveform reaches in each
+    of `columns` pixel columns: a step line at low density, a solid block
+    where the bits are closer together than the pixels.
+    """
+    bounds, lo, hi = waveform.envelope(columns)
+    x = np.repeat(bounds, 2)[1:-1]
+    return np.concatenate((
+        np.column_stack((x, np.repeat(hi, 2))),
+        np.column_stack((x[::-1], np.repeat(lo[::-1], 2)))
+    ))
+
+
 # Main application class
 class EncodingApp:
     def __init__(self, root):
@@ -13,6 +43,10 @@ class EncodingApp:
         - Creates frames for input, buttons, and the plot.
         - Initializes UI components.
         """
+        import tkinter as tk
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         self.root = root
         self.root.title("Digital-to-Digital Encoding Schemes")
         self.root.geometry("1000x750")
@@ -20,8 +54,11 @@ class EncodingApp:
         # --- State Variables ---
         self.buttons = {}
         self.active_button = None
-        # For AMI, B8ZS, HDB3: tracks the polarity of the last '1' bit (+1 or -1)
-        self.last_pulse_polarity = -1 
+        self.active_method = None
+        # Encoders, caches and the all-schemes pool, shared with the Kivy viewer
+        self.logic = EncodingLogic()
+        # Per-stage timings of each redraw, shown over the plot when enabled
+        self.profiler = StageProfiler.from_environment('tk')
 
         # --- Main Layout Frames ---
         # Top frame for input field
@@ -31,6 +68,11 @@ class EncodingApp:
         # Middle frame for encoding buttons
         button_frame = tk.Frame(root, pady=10)
         button_frame.pack(fill=tk.X)
+
+        # Statistics panel between the buttons and the plot
+        self.stats_panel = tk.Label(root, font=("Courier", 10), justify=tk.LEFT, anchor='w', padx=20)
+        self.stats_panel.pack(fill=tk.X)
+        self.stats_job = None
         
         # Bottom frame for the plot
         self.plot_frame = tk.Frame(root, padx=10, pady=10)
@@ -42,14 +84,21 @@ class EncodingApp:
         self.binary_entry = tk.Entry(input_frame, width=50, font=("Arial", 12))
         self.binary_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 20))
         self.binary_entry.insert(0, "0100000000110") # Default value for demonstration
+        # Re-plot the active scheme live as the user types
+        self.binary_entry.bind("<KeyRelease>", self.on_input_changed)
+        # Toggles the per-stage timing overlay
+        self.profile_var = tk.BooleanVar(value=self.profiler.enabled)
+        tk.Checkbutton(
+            input_frame, text="Profile", variable=self.profile_var, command=self.on_profile_toggle
+        ).pack(side=tk.LEFT, padx=(0, 20))
 
         # Buttons section
         encoding_methods = [
             "Unipolar", "NRZ-L", "NRZ-I", "RZ", "Manchester", 
-            "Differential Manchester", "AMI", "B8ZS", "HDB3"
+            "Differential Manchester", "AMI", "B8ZS", "HDB3", ALL_SCHEMES
         ]
         
-        # Create 9 buttons in a 2x5 grid layout for better spacing
+        # Create 10 buttons in a 2x5 grid layout for better spacing
         for i, method in enumerate(encoding_methods):
             btn = tk.Button(
                 button_frame,
@@ -78,6 +127,12 @@ class EncodingApp:
         self.fig, self.ax = plt.subplots()
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.setup_plot()
+
+        # Profiling overlay in the top right corner of the plot
+        self.profile_overlay = tk.Label(self.plot_frame, font=("Courier", 9), fg="darkred", bg="white", justify=tk.LEFT)
+        if self.profiler.enabled:
+            self.profile_overlay.place(relx=1.0, rely=0.0, anchor='ne')
 
         # Plot the default value on startup
         self.plot_encoding("Unipolar")
@@ -88,10 +143,28 @@ class EncodingApp:
         Shows an error message if invalid.
         """
         if not re.match("^[01]+$", binary_string):
+            from tkinter import messagebox
             messagebox.showerror("Invalid Input", "Please enter a valid binary string (only '0's and '1's).")
             return False
         return True
 
+    def on_input_changed(self, event):
+        """
+        Re-encodes the active scheme after each keystroke. Invalid input is
+        skipped silently here; the error dialog is kept for button presses.
+        """
+        if self.active_method and re.match("^[01]+$", self.binary_entry.get()):
+            self.plot_encoding(self.active_method)
+
+    def on_profile_toggle(self):
+        enabled = self.profile_var.get()
+        self.profiler.set_enabled(enabled)
+        if enabled:
+            self.profile_overlay.config(text=format_frame(self.profiler.last))
+            self.profile_overlay.place(relx=1.0, rely=0.0, anchor='ne')
+        else:
+            self.profile_overlay.place_forget()
+
     def update_button_styles(self, active_method):
         """
         Updates the button colors. The active button turns red, others turn black.
@@ -101,31 +174,104 @@ class EncodingApp:
         
         self.active_button = self.buttons[active_method]
         self.active_button.config(bg="red", fg="white")
+        self.active_method = active_method
 
-    def plot_waveform(self, x, y, title):
+    def setup_plot(self):
         """
-        Clears the previous plot and draws the new waveform.
+        Creates the artists that persist across plots. Only the waveform and
+        the title change on a scheme switch; they are animated, so they are
+        drawn over a cached background instead of redrawing the figure.
         """
-        self.ax.clear()
-        # Use 'steps-pre' for a clean digital signal look
-        self.ax.step(x, y, where='post', color='blue', linewidth=2)
-        
-        # Add horizontal lines for levels and bit boundaries
+        from matplotlib.collections import LineCollection
+        from matplotlib.patches import Polygon
+
+        # The signal is a band of its per-pixel-column levels (band_vertices)
+        self.wave_band = Polygon(
+            np.zeros((0, 2)), closed=True, facecolor='blue', edgecolor='blue',
+            linewidth=2, joinstyle='miter', animated=True
+        )
+        self.ax.add_patch(self.wave_band)
+        self.ax.title.set_animated(True)
+
+        # Add horizontal lines for levels and bit boundaries.
+        # The boundaries are one collection spanning the full axes height.
         self.ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
-        for i in range(len(self.binary_entry.get()) + 1):
-            self.ax.axvline(i, color='gray', linestyle=':', linewidth=0.5)
+        self.bit_lines = LineCollection(
+            [], colors='gray', linestyles=':', linewidths=0.5,
+            transform=self.ax.get_xaxis_transform()
+        )
+        self.ax.add_collection(self.bit_lines)
 
-        self.ax.set_title(title, fontsize=14, fontweight='bold')
         self.ax.set_xlabel("Time (bit intervals)", fontsize=12)
         self.ax.set_ylabel("Voltage Level", fontsize=12)
-        
-        # Set y-axis limits and ticks for clarity
-        max_y = max(abs(val) for val in y) if y else 1
-        self.ax.set_ylim(-max_y - 0.5, max_y + 0.5)
-        self.ax.set_yticks(sorted(list(set(y))))
-
         self.ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        self.canvas.draw()
+
+        # Stacked per-scheme axes, created on first use of ALL_SCHEMES
+        self.strips = {}
+
+        # Everything that ends up in the cached background
+        self.layout_key = None
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        """
+        Runs after every full draw (including resizes): caches the static
+        background and paints the animated artists on top of it.
+        """
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        if self.ax.get_visible():
+            self.draw_animated()
+
+    def draw_animated(self):
+        self.ax.draw_artist(self.wave_band)
+        self.fig.draw_artist(self.ax.title)
+
+    def plot_waveform(self, waveform, title, frame=NULL_FRAME):
+        """
+        Updates the persistent artists with the new waveform.
+        - The band has a vertex pair per pixel column, so its size is bounded
+          by the axes width rather than the number of bits.
+        - Axis limits and bit boundaries only depend on the input length and
+          the signal amplitude; when those are unchanged the figure is
+          blitted, otherwise one full draw refreshes the background.
+        """
+        if not self.ax.get_visible():
+            self.show_strips(False)
+        # The waveform's own extent: the entry may have changed since the encode
+        bits_length = round(waveform.end)
+        width = max(1, int(self.ax.bbox.width))
+        # Same margins matplotlib's autoscaling used to apply
+        margin = 0.05 * max(1, bits_length)
+        with frame.stage('layout') as record:
+            vertices = band_vertices(waveform, width * bits_length / (bits_length + 2 * margin))
+            record['points'] = len(vertices)
+        self.wave_band.set_xy(vertices)
+        self.ax.set_title(title, fontsize=14, fontweight='bold')
+
+        max_y = waveform.max_abs_level()
+        # Ticks at the levels the signal takes, as the original plot had
+        levels = waveform.distinct_levels()
+        layout_key = (bits_length, max_y, tuple(levels), width)
+        with frame.stage('draw'):
+            if layout_key != self.layout_key or self.background is None:
+                self.layout_key = layout_key
+                self.ax.set_xlim(-margin, bits_length + margin)
+
+                # Set y-axis limits and ticks for clarity
+                self.ax.set_ylim(-max_y - 0.5, max_y + 0.5)
+                self.ax.set_yticks(levels)
+
+                # Every bit gets a boundary until they would crowd together
+                step = grid_step(bits_length, width, BIT_LINE_MIN_SPACING)
+                self.bit_lines.set_segments([
+                    [(i, 0), (i, 1)] for i in range(0, bits_length + 1, step)
+                ])
+                self.canvas.draw()
+            else:
+                self.canvas.restore_region(self.background)
+                self.draw_animated()
+                self.canvas.blit(self.fig.bbox)
 
     def plot_encoding(self, method):
         """
@@ -133,181 +279,103 @@ class EncodingApp:
         calls the appropriate encoding logic, and plots the result.
         """
         binary_string = self.binary_entry.get()
-        if not self.validate_input(binary_string):
+        frame = self.profiler.frame(method, bits=len(binary_string))
+        with frame.stage('validate'):
+            valid = self.validate_input(binary_string)
+        if not valid:
             return
 
         self.update_button_styles(method)
-        
-        # Reset polarity for schemes that need it
-        self.last_pulse_polarity = -1
-
-        # Dictionary mapping method names to their handler functions
-        encoding_functions = {
-            "Unipolar": self.get_unipolar,
-            "NRZ-L": self.get_nrz_l,
-            "NRZ-I": self.get_nrz_i,
-            "RZ": self.get_rz,
-            "Manchester": self.get_manchester,
-            "Differential Manchester": self.get_diff_manchester,
-            "AMI": self.get_ami,
-            "B8ZS": self.get_b8zs,
-            "HDB3": self.get_hdb3
-        }
-
-        # Call the selected encoding function
-        x, y = encoding_functions[method](binary_string)
-        
-        self.plot_waveform(x, y, f"{method} Encoding")
-
-    # --- ENCODING LOGIC FUNCTIONS ---
-    
-    def get_unipolar(self, data):
-        x, y = [0], [0]
-        for i, bit in enumerate(data):
-            level = 1 if bit == '1' else 0
-            x.extend([i, i + 1])
-            y.extend([level, level])
-        return x, y
-
-    def get_nrz_l(self, data):
-        x, y = [0], [1] # Start at a default level
-        for i, bit in enumerate(data):
-            level = -1 if bit == '1' else 1
-            x.extend([i, i + 1])
-            y.extend([level, level])
-        return x, y
-
-    def get_nrz_i(self, data):
-        x, y = [0], [1] # Start at a positive level
-        current_level = 1
-        for i, bit in enumerate(data):
-            if bit == '1':
-                current_level *= -1 # Invert on 1
-            x.extend([i, i + 1])
-            y.extend([current_level, current_level])
-        return x, y
-
-    def get_rz(self, data):
-        x, y = [0], [0]
-        for i, bit in enumerate(data):
-            if bit == '0':
-                x.extend([i, i + 1])
-                y.extend([0, 0])
-            else: # bit == '1'
-                x.extend([i, i + 0.5, i + 0.5, i + 1])
-                y.extend([1, 1, 0, 0])
-        return x, y
-
-    def get_manchester(self, data):
-        x, y = [0], [1] # Start level
-        for i, bit in enumerate(data):
-            if bit == '0': # High-to-low transition
-                x.extend([i, i + 0.5, i + 0.5, i + 1])
-                y.extend([1, 1, -1, -1])
-            else: # Low-to-high transition
-                x.extend([i, i + 0.5, i + 0.5, i + 1])
-                y.extend([-1, -1, 1, 1])
-        return x, y
-
-    def get_diff_manchester(self, data):
-        x, y = [0], [1] # Start level
-        current_level = 1
-        for i, bit in enumerate(data):
-            # Transition at the start for '0'
-            if bit == '0':
-                current_level *= -1
-            
-            # Mid-bit transition for all bits
-            x.extend([i, i + 0.5, i + 0.5, i + 1])
-            y.extend([current_level, current_level, -current_level, -current_level])
-            
-            # Update level for the next bit
-            current_level *= -1
-        return x, y
-        
-    def get_ami(self, data, is_scrambled=False):
-        x, y = [0], [0]
-        # Allow pre-scrambled data with 'V' and 'B' for B8ZS/HDB3
-        symbols = data if is_scrambled else [(bit, 'normal') for bit in data]
-
-        for i, (symbol, type) in enumerate(symbols):
-            if symbol == '0':
-                x.extend([i, i + 1])
-                y.extend([0, 0])
-            else: # For '1' or substitution symbols
-                # 'V' (violation) uses the same polarity, 'B' (bipolar) and '1' alternate
-                if type != 'violation': 
-                    self.last_pulse_polarity *= -1
-                
-                x.extend([i, i + 1])
-                y.extend([self.last_pulse_polarity, self.last_pulse_polarity])
-        return x, y
-
-    def get_b8zs(self, data):
-        # B8ZS Substitution: 000V B0VB
-        # V = Violation, B = Bipolar
-        scrambled_data = []
-        i = 0
-        while i < len(data):
-            if data[i:i+8] == '00000000':
-                # Determine polarity for V and B based on the last pulse
-                v_polarity = self.last_pulse_polarity
-                b_polarity = -self.last_pulse_polarity
-
-                # Replace with pattern. Use custom types to guide AMI logic.
-                scrambled_data.extend([('0', 'normal'), ('0', 'normal'), ('0', 'normal')])
-                scrambled_data.append(('V', 'violation')) # V has same polarity as last pulse
-                scrambled_data.append(('B', 'bipolar')) # B has opposite polarity
-                scrambled_data.extend([('0', 'normal')])
-                scrambled_data.append(('V', 'violation'))
-                scrambled_data.append(('B', 'bipolar'))
-
-                # Update the last pulse polarity after the substitution
-                self.last_pulse_polarity = b_polarity
-                i += 8
+        if method == ALL_SCHEMES:
+            with frame.stage('encode') as record:
+                waveforms = self.logic.get_all_waveforms(binary_string)
+                record['points'] = sum(len(w) for w in waveforms.values())
+            self.plot_all_waveforms(waveforms, frame)
+        else:
+            # Vectorized encode straight to an edge list: from the cache when
+            # possible, else resumed from this scheme's previous encoding
+            with frame.stage('encode') as record:
+                waveform = self.logic.get_waveform(method, binary_string)
+                record['points'] = len(waveform)
+
+            self.plot_waveform(waveform, f"{method} Encoding", frame)
+        frame.finish()
+        if self.profiler.enabled:
+            self.profile_overlay.config(text=format_frame(self.profiler.last))
+        self.schedule_stats(method, binary_string)
+
+    def schedule_stats(self, method, binary_string):
+        """(Re)starts the countdown to measuring the statistics panel."""
+        if self.stats_job is not None:
+            self.root.after_cancel(self.stats_job)
+        self.stats_panel.config(fg="grey")
+        self.stats_job = self.root.after(STATS_DELAY_MS, lambda: self.update_stats(method, binary_string))
+
+    def update_stats(self, method, binary_string):
+        self.stats_job = None
+        frame = self.profiler.frame(f"{method} stats", bits=len(binary_string))
+        with frame.stage('stats'):
+            if method == ALL_SCHEMES:
+                text = format_stats_table(self.logic.get_all_stats(binary_string))
             else:
-                bit = data[i]
-                scrambled_data.append((bit, 'normal'))
-                if bit == '1':
-                    self.last_pulse_polarity *= -1
-                i += 1
-        
-        # Reset polarity to plot from the beginning
-        self.last_pulse_polarity = -1
-        return self.get_ami(scrambled_data, is_scrambled=True)
-
-    def get_hdb3(self, data):
-        # HDB3 Substitution: 000V or B00V
-        scrambled_data = []
-        i = 0
-        ones_since_last_sub = 0
-        while i < len(data):
-            if data[i:i+4] == '0000':
-                if ones_since_last_sub % 2 == 0: # Even number of 1s -> B00V
-                    scrambled_data.append(('B', 'bipolar'))
-                    scrambled_data.extend([('0', 'normal'), ('0', 'normal')])
-                    scrambled_data.append(('V', 'violation'))
-                    self.last_pulse_polarity *= -1 # V is a violation, so polarity stays same relative to B
-                else: # Odd number of 1s -> 000V
-                    scrambled_data.extend([('0', 'normal'), ('0', 'normal'), ('0', 'normal')])
-                    scrambled_data.append(('V', 'violation'))
-                
-                ones_since_last_sub = 0 # Reset counter
-                i += 4
-            else:
-                bit = data[i]
-                scrambled_data.append((bit, 'normal'))
-                if bit == '1':
-                    ones_since_last_sub += 1
-                    self.last_pulse_polarity *= -1
-                i += 1
-        
-        # Reset polarity and plot the scrambled data
-        self.last_pulse_polarity = -1
-        return self.get_ami(scrambled_data, is_scrambled=True)
+                text = format_stats(self.logic.get_stats(method, binary_string))
+            self.stats_panel.config(text=text, fg="black")
+        frame.finish()
+        if self.profiler.enabled:
+            self.profile_overlay.config(text=format_frame(self.profiler.last))
+
+    def show_strips(self, visible):
+        """Switches between the single-scheme axes and the stacked strips."""
+        self.ax.set_visible(not visible)
+        for ax, band in self.strips.values():
+            ax.set_visible(visible)
+        # The single-scheme background has to be redrawn when it comes back
+        self.layout_key = None
+
+    def plot_all_waveforms(self, waveforms, frame=NULL_FRAME):
+        """
+        Small multiples: one strip per scheme, stacked on a shared time axis.
+        The strips are created on first use and hidden again in single-scheme
+        mode. Switching views is rare, so this always does a full draw.
+        """
+        if not self.strips:
+            from matplotlib.patches import Polygon
+            grid = self.fig.add_gridspec(len(SCHEMES), 1, left=0.25, hspace=0.2)
+            first = None
+            for i, method in enumerate(SCHEMES):
+                ax = self.fig.add_subplot(grid[i], sharex=first)
+                first = first or ax
+                band = Polygon(np.zeros((0, 2)), closed=True, facecolor='blue', edgecolor='blue', linewidth=1)
+                ax.add_patch(band)
+                ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
+                ax.set_ylabel(method, rotation=0, ha='right', va='center', fontsize=9)
+                ax.set_yticks([])
+                ax.tick_params(labelbottom=(i == len(SCHEMES) - 1))
+                self.strips[method] = (ax, band)
+            ax.set_xlabel("Time (bit intervals)", fontsize=12)
+        self.show_strips(True)
+
+        bits_length = round(max(waveform.end for waveform in waveforms.values()))
+        margin = 0.05 * max(1, bits_length)
+        with frame.stage('layout') as record:
+            record['points'] = 0
+            for method, (ax, band) in self.strips.items():
+                width = max(1, int(ax.bbox.width))
+                vertices = band_vertices(waveforms[method], width * bits_length / (bits_length + 2 * margin))
+                record['points'] += len(vertices)
+                band.set_xy(vertices)
+                max_y = max(1, waveforms[method].max_abs_level())
+                ax.set_ylim(-max_y - 0.5, max_y + 0.5)
+        first_ax = self.strips[SCHEMES[0]][0]
+        first_ax.set_xlim(-margin, bits_length + margin)
+        first_ax.set_title("All Schemes", fontsize=14, fontweight='bold')
+        with frame.stage('draw'):
+            self.canvas.draw()
 
 # Main execution block
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     app = EncodingApp(root)
     root.mainloop()
+    app.logic.shutdown()
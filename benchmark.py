@@ -0,0 +1,346 @@
+"""
+Benchmark harness for the encoders and the renderers.
+
+    python benchmark.py -o bench.json
+    python benchmark.py --compare bench.json --threshold 1.25
+
+Times every scheme, for each bit pattern (all zeros, which keeps B8ZS/HDB3
+substituting, all ones, and random) and input size (10^2 .. 10^7 bits), in
+these targets:
+- encode: the vectorized engine, `encoding_core.encode_waveform()`,
+- logic: `EncodingLogic.get_*`, the breakpoint lists both viewers share,
+- kivy: a headless `WaveformCanvas.draw_waveform()` (Kivy's mock GL backend),
+- agg: `EncodingApp.plot_waveform()` with a full draw on an off-screen Agg
+  canvas, and agg-blit: the same on a scheme switch, which only blits.
+The renders are timed for the random pattern only. logic returns Python
+lists of about two entries per bit (several GB at 10^7 bits), so it stops
+at --max-list-bits.
+
+Each case is timed best-of `--repeat` (a single run once a case takes
+longer than a second), then run once more under tracemalloc for its peak
+memory, NumPy buffers included. The results are written as JSON. `--compare`
+matches them with a saved run by (target, scheme, pattern, bits) and flags
+every case that got slower or bigger than `--threshold` times the baseline;
+the exit status is 1 if there are any.
+
+`--startup` also times, in fresh interpreters, the import of the encoders
+and of both viewers' modules (after NumPy, timed separately) and reports
+any UI toolkit an import pulled in.
+
+The GUI toolkits are only imported for the targets that need them.
+"""
+import argparse
+import compileall
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from encoding_core import SCHEMES, encode_waveform
+
+PATTERNS = ('zeros', 'ones', 'random')
+DEFAULT_SIZES = tuple(10 ** exponent for exponent in range(2, 8))
+DEFAULT_MAX_LIST_BITS = 10 ** 6
+TARGETS = ('encode', 'logic', 'kivy', 'agg', 'agg-blit')
+# Cases longer than this (in seconds) are timed once
+SINGLE_RUN_SECONDS = 1.0
+# Differences below these are noise, whatever the ratio
+TIME_FLOOR = 1e-4
+MEMORY_FLOOR = 64 << 10
+STARTUP_FLOOR = 5e-3
+
+# Modules `--startup` imports, and the toolkits they must not pull in
+STARTUP_MODULES = ('encoding_core', 'encoding_logic', 'app', 'main')
+UI_MODULES = ('kivy', 'tkinter', 'matplotlib')
+
+# get_* method of each scheme in EncodingLogic
+METHOD_NAMES = {
+    'Unipolar': 'get_unipolar', 'NRZ-L': 'get_nrz_l', 'NRZ-I': 'get_nrz_i',
+    'RZ': 'get_rz', 'Manchester': 'get_manchester',
+    'Differential Manchester': 'get_diff_manchester', 'AMI': 'get_ami',
+    'B8ZS': 'get_b8zs', 'HDB3': 'get_hdb3',
+}
+
+
+def make_input(pattern, bits, seed=0):
+    """A '0'/'1' string of `bits` bits, as the viewers pass to the encoders."""
+    if pattern == 'zeros':
+        return '0' * bits
+    if pattern == 'ones':
+        return '1' * bits
+    digits = np.random.default_rng(seed).integers(0, 2, bits, dtype=np.uint8) + ord('0')
+    return digits.tobytes().decode('ascii')
+
+
+class _Entry:
+    """Stands in for the Tk entry `EncodingApp.plot_waveform()` reads the input from."""
+
+    def __init__(self):
+        self.text = ''
+
+    def get(self):
+        return self.text
+
+
+def _logic_methods():
+    from encoding_logic import EncodingLogic
+    logic = EncodingLogic()
+    return {scheme: getattr(logic, name) for scheme, name in METHOD_NAMES.items()}
+
+
+def _kivy_renderer():
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    from kivy_ui import WaveformCanvas
+    canvas = WaveformCanvas(size=(1000, 600))
+
+    def render(scheme, data, waveform):
+        canvas.draw_waveform(waveform, scheme=scheme)
+    return render
+
+
+def _agg_renderer(full_draw):
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from app import EncodingApp
+    app = EncodingApp.__new__(EncodingApp)
+    app.fig = Figure(figsize=(10, 6))
+    app.canvas = FigureCanvasAgg(app.fig)
+    app.ax = app.fig.add_subplot()
+    app.binary_entry = _Entry()
+    app.setup_plot()
+
+    def render(scheme, data, waveform):
+        app.binary_entry.text = data
+        if full_draw:
+            app.layout_key = None
+        app.plot_waveform(waveform, f"{scheme} Encoding")
+    return render
+
+
+def time_case(run, repeat, memory=True):
+    """Best and median wall time of `run()` over `repeat` runs, and its peak traced memory."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+        if times[-1] > SINGLE_RUN_SECONDS:
+            break
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return min(times), statistics.median(times), len(times), peak
+
+
+def run_benchmarks(targets=TARGETS, schemes=SCHEMES, patterns=PATTERNS, sizes=DEFAULT_SIZES,
+                   max_list_bits=DEFAULT_MAX_LIST_BITS, repeat=5, memory=True, log=None):
+    """Runs every case and returns the list of result records."""
+    encoders = {'encode': {scheme: (lambda data, s=scheme: encode_waveform(s, data)) for scheme in schemes}}
+    if 'logic' in targets:
+        encoders['logic'] = _logic_methods()
+    renderers = {}
+    if 'kivy' in targets:
+        renderers['kivy'] = _kivy_renderer()
+    if 'agg' in targets:
+        renderers['agg'] = _agg_renderer(full_draw=True)
+    if 'agg-blit' in targets:
+        renderers['agg-blit'] = _agg_renderer(full_draw=False)
+
+    results = []
+    for pattern in patterns:
+        for bits in sizes:
+            data = make_input(pattern, bits)
+            for scheme in schemes:
+                cases = []
+                for target in ('encode', 'logic'):
+                    if target in targets and (target == 'encode' or bits <= max_list_bits):
+                        cases.append((target, lambda f=encoders[target][scheme]: f(data)))
+                if pattern == 'random' and renderers:
+                    waveform = encode_waveform(scheme, data)
+                    for target, render in renderers.items():
+                        # The first draw sets the layout the blitting path reuses
+                        render(scheme, data, waveform)
+                        cases.append((target, lambda r=render, w=waveform: r(scheme, data, w)))
+                for target, run in cases:
+                    best, median, runs, peak = time_case(run, repeat, memory)
+                    record = {
+                        'target': target, 'scheme': scheme, 'pattern': pattern, 'bits': bits,
+                        'best_s': best, 'median_s': median, 'runs': runs,
+                        'bits_per_s': bits / max(best, 1e-9), 'peak_bytes': peak,
+                    }
+                    results.append(record)
+                    if log:
+                        log(format_record(record))
+    return results
+
+
+_STARTUP_SCRIPT = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+import numpy
+numpy_done = time.perf_counter()
+importlib.import_module(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps([numpy_done - started, done - numpy_done, [m for m in sys.argv[2:] if m in sys.modules]]))
+'''
+
+
+def startup_times(modules=STARTUP_MODULES, repeat=5):
+    """
+    Import time of each module in a fresh interpreter, best of `repeat`:
+    NumPy is imported first and timed on its own, so `import_s` is what the
+    module adds on top. `ui_modules` lists the toolkits the import loaded.
+    The modules are byte-compiled first, as they are in an installed app.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    compileall.compile_dir(here, maxlevels=0, quiet=1)
+    results = []
+    for module in modules:
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, '-c', _STARTUP_SCRIPT, module, *UI_MODULES],
+                cwd=here, capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.splitlines()[-1]))
+        results.append({
+            'module': module,
+            'numpy_s': min(run[0] for run in runs),
+            'import_s': min(run[1] for run in runs),
+            'ui_modules': runs[0][2],
+        })
+    return results
+
+
+def format_startup(record):
+    ui = ', '.join(record['ui_modules']) or 'none'
+    return (
+        f"startup  {record['module']:<24} {record['import_s'] * 1e3:8.2f} ms "
+        f"(numpy {record['numpy_s'] * 1e3:.1f} ms)  UI toolkits loaded: {ui}"
+    )
+
+
+def format_record(record):
+    peak = '' if record['peak_bytes'] is None else f"  peak {record['peak_bytes'] / 2**20:8.2f} MiB"
+    return (
+        f"{record['target']:<8} {record['scheme']:<24} {record['pattern']:<6} {record['bits']:>10,} bits "
+        f"{record['best_s'] * 1e3:10.3f} ms  {record['bits_per_s'] / 1e6:9.2f} Mbit/s{peak}"
+    )
+
+
+def case_key(record):
+    return record['target'], record['scheme'], record['pattern'], record['bits']
+
+
+def compare(results, baseline, threshold, startup=(), baseline_startup=()):
+    """
+    Cases at least `threshold` times slower (best time) or bigger (peak
+    memory) than in `baseline`, as (record, metric, ratio) triples, then
+    modules whose import got that much slower than in `baseline_startup`.
+    """
+    previous = {case_key(record): record for record in baseline}
+    regressions = []
+    for record in results:
+        old = previous.get(case_key(record))
+        if old is None:
+            continue
+        ratio = max(record['best_s'], TIME_FLOOR) / max(old['best_s'], TIME_FLOOR)
+        if ratio >= threshold:
+            regressions.append((record, 'time', ratio))
+        if record['peak_bytes'] is not None and old.get('peak_bytes') is not None:
+            ratio = max(record['peak_bytes'], MEMORY_FLOOR) / max(old['peak_bytes'], MEMORY_FLOOR)
+            if ratio >= threshold:
+                regressions.append((record, 'memory', ratio))
+    previous = {record['module']: record for record in baseline_startup}
+    for record in startup:
+        old = previous.get(record['module'])
+        if old is None:
+            continue
+        ratio = max(record['import_s'], STARTUP_FLOOR) / max(old['import_s'], STARTUP_FLOOR)
+        if ratio >= threshold:
+            regressions.append((record, 'startup', ratio))
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-o', '--output', help="write the JSON results here (default: stdout)")
+    parser.add_argument('-t', '--target', dest='targets', action='append', choices=TARGETS,
+                        help="target to run (repeatable; default: all)")
+    parser.add_argument('-s', '--scheme', dest='schemes', action='append', choices=SCHEMES,
+                        help="scheme to run (repeatable; default: all)")
+    parser.add_argument('-p', '--pattern', dest='patterns', action='append', choices=PATTERNS,
+                        help="bit pattern (repeatable; default: all)")
+    parser.add_argument('--sizes', type=lambda text: [int(float(size)) for size in text.split(',')],
+                        default=list(DEFAULT_SIZES), help="comma-separated input sizes in bits (default: 1e2,...,1e7)")
+    parser.add_argument('--max-list-bits', type=int, default=DEFAULT_MAX_LIST_BITS,
+                        help="largest input for the list-returning logic/app targets (default: 10^6)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case (default: 5)")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip the peak-memory runs")
+    parser.add_argument('--startup', action='store_true',
+                        help="also time the imports of the encoders and viewers in fresh interpreters")
+    parser.add_argument('--compare', metavar='BASELINE', help="saved results to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown / growth factor that counts as a regression (default: 1.25)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Kivy redirects sys.stderr into its log file once imported
+    stderr = sys.stderr
+    startup = startup_times() if args.startup else []
+    for record in startup:
+        print(format_startup(record), file=stderr, flush=True)
+    results = run_benchmarks(
+        targets=args.targets or TARGETS, schemes=args.schemes or SCHEMES,
+        patterns=args.patterns or PATTERNS, sizes=args.sizes, max_list_bits=args.max_list_bits,
+        repeat=max(1, args.repeat), memory=args.memory,
+        log=lambda line: print(line, file=stderr, flush=True),
+    )
+    report = {'environment': environment(), 'startup': startup, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold, startup, baseline.get('startup', ()))
+        for record, metric, ratio in regressions:
+            line = format_startup(record) if metric == 'startup' else format_record(record)
+            print(f"REGRESSION {metric} x{ratio:.2f}: {line}", file=stderr)
+        print(f"{len(regressions)} regression(s) against {args.compare}", file=stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
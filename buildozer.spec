@@ -5,7 +5,7 @@ package.domain = org.example
 source.dir = .
 source.include_exts = py,kv,txt,md
 version = 1.0.0
-requirements = python3,kivy
+requirements = python3,kivy,numpy
 orientation = portrait
 fullscreen = 0
 log_level = 2
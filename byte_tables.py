@@ -0,0 +1,223 @@
+"""
+Table-driven byte-at-a-time encoding engine.
+
+Each scheme is a `SchemeTable`: a small state machine given by the
+`LineState` fields it uses and a per-bit `step(state, bit)` returning the
+next state and the levels that became final. The first time a scheme is
+used, every state is run against every byte value (MSB first) to fill
+- next_state[state, byte], and
+- the levels emitted for those eight bits (`width` at most),
+so encoding packed input costs one table lookup per byte instead of a
+Python branch per bit. The only Python loop left is the state recurrence,
+which `itertools.accumulate` runs over plain ints; the levels are gathered
+from the tables with NumPy.
+
+B8ZS and HDB3 hold zeros back until they know whether the zeros end up in a
+substitution block, so their tables emit a variable number of levels per
+byte and keep the count of pending zeros in the state.
+
+Adding a scheme means writing its step function and adding a `SchemeTable`
+to `TABLES`.
+"""
+from itertools import accumulate, product
+import mmap
+
+import numpy as np
+
+from encoding_core import LineState, START_LEVELS, Y_DTYPE, level_points, to_bits
+from packed_bits import PackedBits
+
+
+class SchemeTable:
+    def __init__(self, step, fields=None, samples_per_bit=1):
+        """
+        - step(state, bit): returns `(next_state, levels)` for one input bit.
+          A state is a tuple with one value per field, in `fields` order.
+        - fields: {LineState field: its possible values}; empty for the
+          stateless schemes.
+        - samples_per_bit: levels per bit once nothing is held back.
+        """
+        self.step = step
+        self.fields = dict(fields or {})
+        self.samples_per_bit = samples_per_bit
+        self.states = list(product(*self.fields.values()))
+        self.index = {state: i for i, state in enumerate(self.states)}
+        self._built = False
+
+    def build(self):
+        """Fills the per-byte tables; runs once per scheme."""
+        if self._built:
+            return
+        rows = len(self.states) * 256
+        next_state = [0] * rows
+        emitted = [None] * rows
+        for i, state in enumerate(self.states):
+            for byte in range(256):
+                levels = []
+                current = state
+                for shift in range(7, -1, -1):
+                    current, out = self.step(current, (byte >> shift) & 1)
+                    levels.extend(out)
+                row = i * 256 + byte
+                # Stored pre-multiplied so the recurrence is one addition
+                next_state[row] = self.index[current] * 256
+                emitted[row] = levels
+
+        self.width = max(len(levels) for levels in emitted)
+        self.levels = np.zeros((rows, self.width), dtype=Y_DTYPE)
+        self.counts = np.empty(rows, dtype=np.intp)
+        for row, levels in enumerate(emitted):
+            self.levels[row, :len(levels)] = levels
+            self.counts[row] = len(levels)
+        self.fixed_width = bool((self.counts == self.width).all())
+        self.next_state = next_state
+        self._built = True
+
+    def load(self, line_state):
+        return tuple(getattr(line_state, field) for field in self.fields)
+
+    def store(self, state, line_state):
+        for field, value in zip(self.fields, state):
+            setattr(line_state, field, value)
+
+
+# --- PER-BIT STEPS ---
+# `pending` is the number of zeros held back since the last decided bit.
+
+def _unipolar_step(state, bit):
+    return state, (bit,)
+
+
+def _nrz_l_step(state, bit):
+    return state, (-1 if bit else 1,)
+
+
+def _nrz_i_step(state, bit):
+    level = -state[0] if bit else state[0]
+    return (level,), (level,)
+
+
+def _rz_step(state, bit):
+    return state, (bit, 0)
+
+
+def _manchester_step(state, bit):
+    return state, ((-1, 1) if bit else (1, -1))
+
+
+def _diff_manchester_step(state, bit):
+    # A '0' steps at the start of the bit, every bit steps at the centre.
+    level = state[0]
+    if bit:
+        return (-level,), (level, -level)
+    return (level,), (-level, level)
+
+
+def _ami_step(state, bit):
+    if not bit:
+        return state, (0,)
+    polarity = -state[0]
+    return (polarity,), (polarity,)
+
+
+def _b8zs_step(state, bit):
+    polarity, pending = state
+    if bit:
+        return (-polarity, 0), (0,) * pending + (-polarity,)
+    if pending < 7:
+        return (polarity, pending + 1), ()
+    # 00000000 -> 000VB0VB
+    return (polarity, 0), (0, 0, 0, polarity, -polarity, 0, -polarity, polarity)
+
+
+def _hdb3_step(state, bit):
+    polarity, parity, pending = state
+    if bit:
+        return (-polarity, parity ^ 1, 0), (0,) * pending + (-polarity,)
+    if pending < 3:
+        return (polarity, parity, pending + 1), ()
+    # 0000 -> B00V after an even number of ones since the last
+    # substitution, 000V after an odd number.
+    if parity == 0:
+        return (-polarity, 0, 0), (-polarity, 0, 0, -polarity)
+    return (polarity, 0, 0), (0, 0, 0, polarity)
+
+
+TABLES = {
+    'Unipolar': SchemeTable(_unipolar_step),
+    'NRZ-L': SchemeTable(_nrz_l_step),
+    'NRZ-I': SchemeTable(_nrz_i_step, {'level': (1, -1)}),
+    'RZ': SchemeTable(_rz_step, samples_per_bit=2),
+    'Manchester': SchemeTable(_manchester_step, samples_per_bit=2),
+    'Differential Manchester': SchemeTable(_diff_manchester_step, {'level': (1, -1)}, samples_per_bit=2),
+    'AMI': SchemeTable(_ami_step, {'polarity': (1, -1)}),
+    'B8ZS': SchemeTable(_b8zs_step, {'polarity': (1, -1), 'pending_zeros': range(8)}),
+    'HDB3': SchemeTable(_hdb3_step, {'polarity': (1, -1), 'ones_parity': (0, 1), 'pending_zeros': range(4)}),
+}
+
+
+def _split_bytes(data):
+    """
+    Returns `(byte_values, tail_bits)`: the input as whole MSB-first bytes
+    plus the 0-7 bits left over. Packed MSB-first input is used as it is.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+        data = PackedBits(data)
+    if isinstance(data, PackedBits) and data.bit_order == 'msb':
+        whole = len(data) // 8
+        return data.bytes[:whole], data.unpack(whole * 8, len(data))
+    bits = to_bits(data)
+    whole = len(bits) // 8 * 8
+    return np.packbits(bits[:whole]), bits[whole:]
+
+
+def encode_levels(scheme, data, state=None, final=True):
+    """
+    Level array for `data`, `SAMPLES_PER_BIT[scheme]` per bit.
+    - state: a `LineState` to start from; updated in place.
+    - final: emit the zeros still held back at the end (B8ZS/HDB3).
+    """
+    table = TABLES[scheme]
+    table.build()
+    if state is None:
+        state = LineState()
+    byte_values, tail = _split_bytes(data)
+
+    start = table.index[table.load(state)] * 256
+    if len(table.states) == 1:
+        rows = byte_values.astype(np.intp)
+        end = start
+    else:
+        next_state = table.next_state
+        before = np.fromiter(
+            accumulate(byte_values.tolist(), lambda s, b: next_state[s + b], initial=start),
+            dtype=np.intp, count=len(byte_values) + 1
+        )
+        rows = before[:-1] + byte_values
+        end = int(before[-1])
+
+    if table.fixed_width:
+        levels = table.levels[rows].ravel()
+    else:
+        counts = table.counts[rows]
+        levels = table.levels[rows][np.arange(table.width) < counts[:, None]]
+
+    # The last 0-7 bits and the held-back zeros go one bit at a time.
+    current = table.states[end // 256]
+    rest = []
+    for bit in tail.tolist():
+        current, out = table.step(current, bit)
+        rest.extend(out)
+    table.store(current, state)
+    if final and state.pending_zeros:
+        rest.extend([0] * state.pending_zeros)
+        state.pending_zeros = 0
+    if rest:
+        levels = np.concatenate((levels, np.array(rest, dtype=Y_DTYPE)))
+    return levels
+
+
+def encode(scheme, data, state=None):
+    """Encodes `data` with the named scheme and returns `(x, y)` arrays."""
+    levels = encode_levels(scheme, data, state)
+    return level_points(levels, TABLES[scheme].samples_per_bit, 0, START_LEVELS[scheme])
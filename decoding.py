@@ -0,0 +1,247 @@
+"""
+Vectorized decoders for the nine line codes, and a round-trip check.
+
+`decode()` turns a level array (`SAMPLES_PER_BIT[scheme]` levels per bit,
+as produced by `encoding_core.encode_levels()`) or a `Waveform` back into
+bits. Besides the bits it reports code errors by bit offset:
+- 'level': a level the scheme never sends (e.g. 0 in NRZ-L).
+- 'mid-bit': a Manchester / Differential Manchester bit without its
+  mid-bit transition, or an RZ bit that does not return to zero.
+- 'violation': an AMI pulse with the same polarity as the previous one
+  that is not part of a recognized B8ZS/HDB3 substitution.
+
+B8ZS (000VB0VB) and HDB3 (000V / B00V) substitutions are recognized from
+their violations and decoded back to zeros.
+
+`round_trip()` encodes, decodes and compares a whole input, reporting the
+throughput and the offset of the first mismatch.
+"""
+import time
+
+import numpy as np
+
+from encoding_core import (
+    LineState, SAMPLES_PER_BIT, SCHEMES, encode_levels, to_bits
+)
+from waveform import Waveform
+
+ERROR_KINDS = ('level', 'mid-bit', 'violation')
+
+
+class Decoded:
+    """
+    Result of `decode()`.
+    - bits: uint8 array of 0/1 values.
+    - errors: {kind: sorted bit offsets} for each kind in ERROR_KINDS.
+    """
+
+    def __init__(self, bits, errors):
+        self.bits = bits
+        self.errors = errors
+
+    def first_error(self):
+        """Offset of the first code error of any kind, or None."""
+        firsts = [int(positions[0]) for positions in self.errors.values() if len(positions)]
+        return min(firsts) if firsts else None
+
+    def error_count(self):
+        return sum(len(positions) for positions in self.errors.values())
+
+
+def waveform_levels(waveform, samples_per_bit):
+    """
+    Samples a `Waveform` at the centre of every bit (or half bit) from its
+    start, giving the level array the decoders expect.
+    """
+    step = 1.0 / samples_per_bit
+    count = int(round((waveform.end - waveform.start) * samples_per_bit))
+    centres = waveform.start + (np.arange(count) + 0.5) * step
+    index = np.searchsorted(waveform.times, centres, side='right') - 1
+    levels = waveform.levels[np.maximum(index, 0)]
+    return np.where(index >= 0, levels, waveform.start_level).astype(np.int8)
+
+
+def _flag(mask):
+    return np.flatnonzero(mask)
+
+
+def _previous(values, first):
+    """`values` shifted right by one, starting with `first`."""
+    return np.concatenate(([first], values[:-1]))[:len(values)].astype(values.dtype)
+
+
+# --- DIRECT MAPPINGS ---
+
+def _unipolar(levels, state):
+    return (levels == 1).astype(np.uint8), {'level': _flag((levels != 0) & (levels != 1))}
+
+
+def _nrz_l(levels, state):
+    return (levels == -1).astype(np.uint8), {'level': _flag(np.abs(levels) != 1)}
+
+
+def _nrz_i(levels, state):
+    bits = (levels != _previous(levels, state.level)).astype(np.uint8)
+    if len(levels):
+        state.level = int(levels[-1])
+    return bits, {'level': _flag(np.abs(levels) != 1)}
+
+
+def _rz(levels, state):
+    first, second = levels[0::2], levels[1::2]
+    return (first == 1).astype(np.uint8), {
+        'level': _flag((first != 0) & (first != 1)),
+        'mid-bit': _flag(second != 0),
+    }
+
+
+def _manchester(levels, state):
+    first, second = levels[0::2], levels[1::2]
+    return (second == 1).astype(np.uint8), {
+        'level': _flag((np.abs(first) != 1) | (np.abs(second) != 1)),
+        'mid-bit': _flag(first != -second),
+    }
+
+
+def _diff_manchester(levels, state):
+    first, second = levels[0::2], levels[1::2]
+    # A '1' has no transition at the start of the bit.
+    bits = (first == _previous(second, state.level)).astype(np.uint8)
+    if len(second):
+        state.level = int(second[-1])
+    return bits, {
+        'level': _flag((np.abs(first) != 1) | (np.abs(second) != 1)),
+        'mid-bit': _flag(first != -second),
+    }
+
+
+# --- BIPOLAR SCHEMES ---
+
+def _violations(levels, state):
+    """
+    Positions of the pulses with the same polarity as the pulse before them
+    (`state.polarity` for the first one). Leaves `state.polarity` at the
+    polarity of the last pulse.
+    """
+    pulses = np.flatnonzero(levels)
+    polarity = levels[pulses]
+    violations = pulses[polarity == _previous(polarity, state.polarity)]
+    if len(pulses):
+        state.polarity = int(polarity[-1])
+    return violations
+
+
+def _matches(levels, starts, pattern):
+    """
+    The `starts` whose window levels[s:s + len(pattern)] equals `pattern`
+    scaled by the window's level at the pattern's first 1.
+    """
+    size = len(pattern)
+    starts = starts[(starts >= 0) & (starts + size <= len(levels))]
+    if not len(starts):
+        return starts
+    windows = np.lib.stride_tricks.sliding_window_view(levels, size)[starts]
+    sign = windows[:, pattern.index(1)][:, None]
+    return starts[(windows == sign * np.array(pattern, dtype=np.int8)).all(axis=1)]
+
+
+def _bipolar_result(levels, violations, blocks=(), size=0):
+    """Bits and errors of an AMI signal whose substitution `blocks` read as zeros."""
+    bits = (levels != 0).astype(np.uint8)
+    substituted = np.zeros(len(levels), dtype=bool)
+    for offset in range(size):
+        substituted[np.asarray(blocks, dtype=np.intp) + offset] = True
+    bits[substituted] = 0
+    return bits, {
+        'level': _flag(np.abs(levels) > 1),
+        'violation': violations[~substituted[violations]],
+    }
+
+
+def _ami(levels, state):
+    return _bipolar_result(levels, _violations(levels, state))
+
+
+def _b8zs(levels, state):
+    violations = _violations(levels, state)
+    # 000VB0VB: V repeats the pulse before it, B alternates.
+    blocks = _matches(levels, violations - 3, (0, 0, 0, 1, -1, 0, -1, 1))
+    blocks = blocks[np.isin(blocks + 6, violations)]
+    return _bipolar_result(levels, violations, blocks, 8)
+
+
+def _hdb3(levels, state):
+    violations = _violations(levels, state)
+    # 000V, or B00V where B alternates and V repeats it.
+    blocks = np.union1d(
+        _matches(levels, violations - 3, (0, 0, 0, 1)),
+        _matches(levels, violations - 3, (1, 0, 0, 1)),
+    )
+    return _bipolar_result(levels, violations, blocks, 4)
+
+
+_DECODERS = {
+    'Unipolar': _unipolar,
+    'NRZ-L': _nrz_l,
+    'NRZ-I': _nrz_i,
+    'RZ': _rz,
+    'Manchester': _manchester,
+    'Differential Manchester': _diff_manchester,
+    'AMI': _ami,
+    'B8ZS': _b8zs,
+    'HDB3': _hdb3,
+}
+
+
+def decode(scheme, signal, state=None):
+    """
+    Decodes `signal` (a level array or a `Waveform`) with the named scheme.
+    `state` is the `LineState` before the first bit; it is updated in place
+    so consecutive chunks of a stream can be decoded one after another
+    (for B8ZS/HDB3, cut chunks outside substitution blocks).
+    """
+    spb = SAMPLES_PER_BIT[scheme]
+    if isinstance(signal, Waveform):
+        levels = waveform_levels(signal, spb)
+    else:
+        levels = np.asarray(signal, dtype=np.int8)
+    levels = levels[:len(levels) // spb * spb]
+    bits, errors = _DECODERS[scheme](levels, LineState() if state is None else state)
+    return Decoded(bits, {kind: errors.get(kind, np.zeros(0, dtype=np.intp)) for kind in ERROR_KINDS})
+
+
+def round_trip(scheme, data):
+    """
+    Encodes `data`, decodes the levels again and compares with the input.
+    Returns a report:
+    - bits, encode_s, decode_s, bits_per_s (for the whole round trip).
+    - first_error: the first offset where the decoded bits differ from the
+      input or a code error is flagged; None for a clean round trip.
+    - code_errors: number of code errors flagged by the decoder.
+    """
+    bits = to_bits(data)
+    started = time.perf_counter()
+    levels = encode_levels(scheme, bits)
+    encoded = time.perf_counter()
+    decoded = decode(scheme, levels)
+    finished = time.perf_counter()
+
+    mismatches = np.flatnonzero(decoded.bits != bits)
+    firsts = [int(mismatches[0])] if len(mismatches) else []
+    if decoded.first_error() is not None:
+        firsts.append(decoded.first_error())
+    return {
+        'scheme': scheme,
+        'bits': len(bits),
+        'encode_s': encoded - started,
+        'decode_s': finished - encoded,
+        'bits_per_s': len(bits) / max(finished - started, 1e-9),
+        'first_error': min(firsts) if firsts else None,
+        'code_errors': decoded.error_count(),
+    }
+
+
+def round_trip_all(data, schemes=SCHEMES):
+    """`round_trip()` of the same input for each scheme."""
+    bits = to_bits(data)
+    return [round_trip(scheme, bits) for scheme in schemes]
@@ -0,0 +1,107 @@
+"""
+Memoized encoding results shared across scheme switches.
+
+`EncodeCache` keeps encoded `Waveform`s keyed by (scheme, input digest) in
+LRU order. Its size is accounted in stored points (waveform edges) rather
+than entries, so one huge input cannot hide behind a small entry count.
+Hit/miss counters are kept for display and benchmarking.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from packed_bits import PackedBits
+
+# About 36 MB of edges (8-byte time + 1-byte level each).
+DEFAULT_MAX_POINTS = 4_000_000
+
+
+def input_digest(data):
+    """Stable digest of an encoder input ('0'/'1' string, buffer, array or PackedBits)."""
+    # hashlib loads OpenSSL, which would dominate this module's import time
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, str):
+        h.update(b's')
+        h.update(data.encode('ascii'))
+    elif isinstance(data, PackedBits):
+        h.update(f'p{data.bit_order}{data.nbits}:'.encode('ascii'))
+        h.update(data.bytes)
+    elif isinstance(data, np.ndarray):
+        h.update(f'a{data.dtype.str}:'.encode('ascii'))
+        h.update(np.ascontiguousarray(data))
+    else:
+        # Raw packed bytes are read MSB first, like PackedBits' default.
+        h.update(b'b')
+        h.update(data)
+    return h.digest()
+
+
+class EncodeCache:
+    def __init__(self, max_points=DEFAULT_MAX_POINTS):
+        self.max_points = max_points
+        self.points = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, scheme, digest):
+        waveform = self._entries.get((scheme, digest))
+        if waveform is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end((scheme, digest))
+        return waveform
+
+    def put(self, scheme, digest, waveform):
+        """Stores `waveform`, evicting least recently used entries to fit."""
+        key = (scheme, digest)
+        if key in self._entries:
+            self._discard(key)
+        if len(waveform) > self.max_points:
+            return
+        self._entries[key] = waveform
+        self.points += len(waveform)
+        self.nbytes += waveform.nbytes
+        while self.points > self.max_points:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get_or_encode(self, scheme, data, encode):
+        """
+        Returns the cached waveform for (scheme, data), calling
+        `encode(scheme, data)` and caching its result on a miss.
+        """
+        digest = input_digest(data)
+        waveform = self.get(scheme, digest)
+        if waveform is None:
+            waveform = encode(scheme, data)
+            self.put(scheme, digest, waveform)
+        return waveform
+
+    def clear(self):
+        self._entries.clear()
+        self.points = 0
+        self.nbytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'points': self.points,
+            'nbytes': self.nbytes,
+            'max_points': self.max_points,
+        }
+
+    def _discard(self, key):
+        waveform = self._entries.pop(key)
+        self.points -= len(waveform)
+        self.nbytes -= waveform.nbytes
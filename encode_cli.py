@@ -0,0 +1,195 @@
+"""
+Headless batch encoder.
+
+    python encode_cli.py capture.bin other.txt -s AMI -s HDB3 -o out/ -j 4
+
+Every input file is stream-encoded under each requested scheme (all nine by
+default) and written to `<outdir>/<file stem>.<scheme>.<format>` by one of
+the streaming exporters: raw int8 levels (i8, the default), .npy, VCD or
+WAV, at `--samples-per-bit` samples per bit (default: the scheme's own
+rate). Inputs are read in chunks, so memory use does not depend on the
+file size. Each (file, scheme)
+pair is one job on a process pool, and a line with its bit count and
+throughput is printed as it finishes. Inputs whose stems collide (in.txt and
+in.bin) keep their whole file name instead; inputs that would still share an
+output (a/cap.bin and b/cap.bin) are rejected before anything is written.
+Each job writes to a temporary name and renames it only once it succeeds.
+A job that fails for any reason is reported and counted, and the others go
+on. If a worker process dies (e.g. killed for memory), the jobs it took down
+with the pool are listed as unfinished and their temporary files removed.
+The exit status is 1 if any job failed.
+
+Text inputs hold '0'/'1' characters (whitespace is ignored); binary inputs
+(`--packed`) hold packed bits in `--bit-order`.
+
+Only the GUI-free modules are imported: no kivy, tkinter or matplotlib.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import os
+import sys
+import time
+
+import numpy as np
+
+from encoding_core import SCHEMES
+from exporters import WRITERS, export
+from packed_bits import BIT_ORDERS, DEFAULT_CHUNK_BITS, PackedBits
+
+TEXT_CHUNK_BYTES = 1 << 20
+_WHITESPACE = np.frombuffer(b' \t\r\n', dtype=np.uint8)
+
+
+def scheme_slug(scheme):
+    """File-name form of a scheme: 'Differential Manchester' -> 'differential-manchester'."""
+    return scheme.lower().replace(' ', '-')
+
+
+def parse_scheme(name):
+    for scheme in SCHEMES:
+        if name.lower() in (scheme.lower(), scheme_slug(scheme)):
+            return scheme
+    raise argparse.ArgumentTypeError(f"unknown scheme {name!r}; choose from {', '.join(SCHEMES)}")
+
+
+def read_text_bits(path, chunk_bytes=TEXT_CHUNK_BYTES):
+    """Yields uint8 0/1 arrays from a text file of '0'/'1' characters."""
+    offset = 0
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                return
+            chars = np.frombuffer(block, dtype=np.uint8)
+            bad = np.flatnonzero((chars != ord('0')) & (chars != ord('1')) & ~np.isin(chars, _WHITESPACE))
+            if len(bad):
+                raise ValueError(f"{path}: invalid character {chr(chars[bad[0]])!r} at byte {offset + int(bad[0])}")
+            offset += len(block)
+            yield chars[(chars == ord('0')) | (chars == ord('1'))] - ord('0')
+
+
+def read_packed_bits(path, bit_order='msb', chunk_bits=DEFAULT_CHUNK_BITS):
+    """Yields uint8 0/1 arrays from a packed capture file."""
+    if os.path.getsize(path) == 0:
+        return iter(())
+    return PackedBits.from_file(path, bit_order).chunks(chunk_bits)
+
+
+def output_names(files):
+    """
+    {input path: output name prefix}: the file stem, or the whole file name
+    where stems collide. Raises ValueError for inputs that would still
+    write the same outputs.
+    """
+    stems = {path: os.path.splitext(os.path.basename(path))[0] for path in files}
+    counts = {}
+    for stem in stems.values():
+        counts[stem] = counts.get(stem, 0) + 1
+    names = {path: stem if counts[stem] == 1 else os.path.basename(path) for path, stem in stems.items()}
+    seen = {}
+    for path in files:
+        if names[path] in seen:
+            raise ValueError(f"{seen[names[path]]} and {path} would write the same outputs")
+        seen[names[path]] = path
+    return names
+
+
+def partial_name(out_path, pid=None):
+    """Temporary name of `out_path` while the run with process id `pid` writes it."""
+    return f'{out_path}.{os.getpid() if pid is None else pid}.part'
+
+
+def encode_file(path, scheme, out_path, packed=False, bit_order='msb', fmt='i8', samples_per_bit=None,
+                partial=None):
+    """
+    Stream-encodes one file under one scheme into `out_path`, through a
+    temporary file (`partial`, by default named after this process) renamed
+    into place on success.
+    Returns `(output path, bits encoded, seconds)`.
+    """
+    chunks = read_packed_bits(path, bit_order) if packed else read_text_bits(path)
+    partial = partial_name(out_path) if partial is None else partial
+    started = time.perf_counter()
+    writer = WRITERS['.' + fmt](partial, scheme, samples_per_bit)
+    try:
+        bits = export(scheme, chunks, writer)
+        os.replace(partial, out_path)
+    except BaseException:
+        # Don't leave a truncated output behind for a bad input
+        os.remove(partial)
+        raise
+    return out_path, bits, time.perf_counter() - started
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('files', nargs='+', help="input files")
+    parser.add_argument('-s', '--scheme', dest='schemes', action='append', type=parse_scheme,
+                        help="scheme to encode with (repeatable; default: all)")
+    parser.add_argument('-o', '--outdir', default='.', help="output directory (default: current)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('-f', '--format', dest='fmt', choices=[suffix[1:] for suffix in WRITERS], default='i8',
+                        help="output format (default: i8)")
+    parser.add_argument('--samples-per-bit', type=int,
+                        help="output samples per bit (default: the scheme's own, 1 or 2)")
+    parser.add_argument('--packed', action='store_true', help="inputs are packed binary, not '0'/'1' text")
+    parser.add_argument('--bit-order', choices=sorted(BIT_ORDERS), default='msb',
+                        help="bit order of packed inputs (default: msb)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    schemes = args.schemes or list(SCHEMES)
+    try:
+        names = output_names(args.files)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.outdir, exist_ok=True)
+    jobs = [(path, scheme) for path in args.files for scheme in schemes]
+
+    failed = 0
+    broken = False
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {}
+        for path, scheme in jobs:
+            out_path = os.path.join(args.outdir, f'{names[path]}.{scheme_slug(scheme)}.{args.fmt}')
+            # Named after this run, so its leftovers can be found if a worker dies
+            partial = partial_name(out_path)
+            future = pool.submit(encode_file, path, scheme, out_path, args.packed, args.bit_order,
+                                 args.fmt, args.samples_per_bit, partial)
+            futures[future] = path, scheme, partial
+        for future in as_completed(futures):
+            path, scheme, partial = futures[future]
+            try:
+                out_path, bits, seconds = future.result()
+            except BrokenProcessPool:
+                failed += 1
+                if not broken:
+                    broken = True
+                    print("error: a worker process died (out of memory?); "
+                          "the jobs still running or queued did not finish", file=sys.stderr)
+                print(f"error: {path} [{scheme}]: not finished", file=sys.stderr)
+                if os.path.exists(partial):
+                    os.remove(partial)
+                continue
+            except (OSError, ValueError) as e:
+                failed += 1
+                print(f"error: {path} [{scheme}]: {e}", file=sys.stderr)
+                continue
+            except Exception as e:
+                failed += 1
+                print(f"error: {path} [{scheme}]: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            rate = bits / max(seconds, 1e-9) / 1e6
+            print(f"{path} [{scheme}] {bits:,} bits in {seconds:.3f} s ({rate:.1f} Mbit/s) -> {out_path}")
+    print(f"{len(jobs) - failed}/{len(jobs)} jobs in {time.perf_counter() - started:.3f} s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
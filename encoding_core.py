@@ -0,0 +1,412 @@
+"""
+Vectorized encoding engine for the nine digital-to-digital line codes.
+
+Every encoder here produces exactly the same waveform as the matching
+`EncodingLogic.get_*` method in encoding_logic.py (shared by both viewers),
+but builds it as contiguous NumPy arrays instead of growing Python lists one
+bit at a time. Nothing in this module imports a GUI toolkit.
+
+Each scheme is a kernel that turns bits into a level array with
+`SAMPLES_PER_BIT[scheme]` levels per bit (two for the schemes with a mid-bit
+step). From those levels the engine builds either
+- an `(x, y)` pair of breakpoint arrays (`encode()`), where `x` (float64)
+  holds times in bit intervals and `y` (int8) the level at each breakpoint,
+  exactly as the list implementations do, or
+- a transition-only `Waveform` (`encode_waveform()`).
+
+`encode()` handles a whole input at once. `StreamEncoder` / `encode_stream()`
+handle an unbounded bitstream in chunks, carrying the line state across chunk
+boundaries so the concatenated segments equal the single-shot waveform.
+
+Inputs may be '0'/'1' strings, 0/1 arrays, or packed bits: `bytes`,
+`bytearray`, `memoryview`, `mmap.mmap` (read MSB first) or a `PackedBits`
+wrapper for another bit order or a memory-mapped capture file.
+"""
+import mmap
+
+import numpy as np
+
+from packed_bits import PackedBits
+from waveform import Waveform
+
+SCHEMES = (
+    'Unipolar', 'NRZ-L', 'NRZ-I', 'RZ', 'Manchester',
+    'Differential Manchester', 'AMI', 'B8ZS', 'HDB3'
+)
+
+X_DTYPE = np.float64
+Y_DTYPE = np.int8
+
+# Level of the leading (0, level) breakpoint of each waveform.
+START_LEVELS = {
+    'Unipolar': 0, 'NRZ-L': 1, 'NRZ-I': 1, 'RZ': 0, 'Manchester': 1,
+    'Differential Manchester': 1, 'AMI': 0, 'B8ZS': 0, 'HDB3': 0,
+}
+
+# Levels emitted per bit: the mid-bit-step schemes emit one per half bit.
+SAMPLES_PER_BIT = {
+    'Unipolar': 1, 'NRZ-L': 1, 'NRZ-I': 1, 'RZ': 2, 'Manchester': 2,
+    'Differential Manchester': 2, 'AMI': 1, 'B8ZS': 1, 'HDB3': 1,
+}
+
+# State field each stateful scheme is odd in: encoding from a state with
+# that field negated negates every level.
+SIGNED_STATE = {
+    'NRZ-I': 'level', 'Differential Manchester': 'level',
+    'AMI': 'polarity', 'B8ZS': 'polarity', 'HDB3': 'polarity',
+}
+
+# Length of the all-zero block each scrambled scheme substitutes.
+SUBSTITUTION_SIZES = {'B8ZS': 8, 'HDB3': 4}
+
+
+class LineState:
+    """
+    Encoder state carried from one chunk of a stream to the next.
+    - level: current NRZ-I / Differential Manchester level.
+    - polarity: polarity of the last AMI/B8ZS/HDB3 pulse.
+    - ones_parity: parity of the ones sent since the last HDB3 substitution.
+    - pending_zeros: trailing zeros held back because they may still become
+      part of a B8ZS/HDB3 substitution block.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.level = 1
+        self.polarity = -1
+        self.ones_parity = 0
+        self.pending_zeros = 0
+
+    def __eq__(self, other):
+        return isinstance(other, LineState) and self.__dict__ == other.__dict__
+
+    def copy(self):
+        other = LineState()
+        other.__dict__.update(self.__dict__)
+        return other
+
+    def negated(self, field):
+        """Copy with `field` ('level' or 'polarity') inverted."""
+        other = self.copy()
+        setattr(other, field, -getattr(self, field))
+        return other
+
+
+def to_bits(data):
+    """
+    Converts the input into a uint8 array of 0/1 values.
+    Accepts a '0'/'1' string, packed bytes, a `PackedBits`, or anything
+    NumPy can turn into an array. Raises ValueError for any other value.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+        data = PackedBits(data)
+    if isinstance(data, PackedBits):
+        return data.unpack()
+    if isinstance(data, str):
+        # A non-ASCII character becomes one '?', so indices still match
+        bits = np.frombuffer(data.encode('ascii', 'replace'), dtype=np.uint8) - ord('0')
+    else:
+        bits = np.asarray(data, dtype=np.uint8)
+    if bits.size and bits.max() > 1:
+        index = int(np.flatnonzero(bits.reshape(-1) > 1)[0])
+        value = data[index] if isinstance(data, str) else np.asarray(data).reshape(-1)[index].item()
+        raise ValueError(f"expected only 0 and 1 bits, got {value!r} at bit {index}")
+    return bits
+
+
+# --- POINT BUILDERS ---
+# `offset` is the time of the first bit; `lead` is the level of the leading
+# (0, level) breakpoint, or None when continuing a stream.
+
+def _full_bit_points(levels, offset, lead):
+    """Two breakpoints per bit: (i, level), (i + 1, level)."""
+    n = len(levels)
+    k = 0 if lead is None else 1
+    x = np.empty(2 * n + k, dtype=X_DTYPE)
+    y = np.empty(2 * n + k, dtype=Y_DTYPE)
+    if k:
+        x[0], y[0] = 0, lead
+    x[k::2] = np.arange(offset, offset + n)
+    x[k + 1::2] = np.arange(offset + 1, offset + n + 1)
+    y[k::2] = levels
+    y[k + 1::2] = levels
+    return x, y
+
+
+def _half_bit_points(first, second, offset, lead):
+    """
+    Four breakpoints per bit with a step at the bit centre, or only the two
+    outer ones when both halves share a level (an RZ '0').
+    """
+    n = len(first)
+    k = 0 if lead is None else 1
+    i = np.arange(offset, offset + n, dtype=X_DTYPE)
+    x = np.empty(4 * n + k, dtype=X_DTYPE)
+    y = np.empty(4 * n + k, dtype=Y_DTYPE)
+    if k:
+        x[0], y[0] = 0, lead
+    x[k::4] = i
+    x[k + 1::4] = i + 0.5
+    x[k + 2::4] = i + 0.5
+    x[k + 3::4] = i + 1
+    y[k::4] = first
+    y[k + 1::4] = first
+    y[k + 2::4] = second
+    y[k + 3::4] = second
+    flat = first == second
+    if flat.any():
+        keep = np.ones(len(x), dtype=bool)
+        keep[k + 1::4] = ~flat
+        keep[k + 2::4] = ~flat
+        x, y = x[keep], y[keep]
+    return x, y
+
+
+def level_points(levels, samples_per_bit, offset=0, lead=None):
+    """Breakpoint arrays `(x, y)` for a level array starting at bit `offset`."""
+    if samples_per_bit == 1:
+        return _full_bit_points(levels, offset, lead)
+    return _half_bit_points(levels[0::2], levels[1::2], offset, lead)
+
+
+def _interleave(first, second):
+    """Joins per-bit first-half and second-half levels into one array."""
+    levels = np.empty(2 * len(first), dtype=Y_DTYPE)
+    levels[0::2] = first
+    levels[1::2] = second
+    return levels
+
+
+def _parity(bits):
+    """Running parity (0/1) of the ones seen so far, inclusive."""
+    return np.bitwise_xor.accumulate(bits, dtype=np.uint8)
+
+
+def _sign(parity):
+    """Maps parity 0/1 to level +1/-1."""
+    return (1 - 2 * parity.astype(Y_DTYPE)).astype(Y_DTYPE)
+
+
+# --- DIRECT MAPPINGS ---
+
+def _unipolar(bits, state):
+    return bits.astype(Y_DTYPE)
+
+
+def _nrz_l(bits, state):
+    return _sign(bits)
+
+
+def _rz(bits, state):
+    return _interleave(bits, 0)
+
+
+def _manchester(bits, state):
+    second = 2 * bits.astype(Y_DTYPE) - 1
+    return _interleave(-second, second)
+
+
+# --- CUMULATIVE-PARITY SCANS ---
+
+def _nrz_i(bits, state):
+    levels = state.level * _sign(_parity(bits))
+    if len(levels):
+        state.level = int(levels[-1])
+    return levels
+
+
+def _diff_manchester(bits, state):
+    # The first half of each bit flips with every '0' and again at the
+    # previous mid-bit, i.e. it follows the parity of the ones so far.
+    first = -state.level * _sign(_parity(bits))
+    if len(first):
+        state.level = -int(first[-1])
+    return _interleave(first, -first)
+
+
+# --- BIPOLAR SCHEMES ---
+
+def _bipolar_levels(flips, violations, state):
+    """
+    AMI core: every flip pulse alternates the polarity, every violation
+    pulse repeats the polarity of the previous pulse.
+    """
+    pol = state.polarity * _sign(_parity(flips))
+    if len(pol):
+        state.polarity = int(pol[-1])
+    return ((flips | violations) * pol).astype(Y_DTYPE)
+
+
+def _zero_runs(bits):
+    """Returns the start positions and lengths of every maximal run of zeros."""
+    edges = np.diff(np.concatenate(([1], bits, [1])).astype(np.int8))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    return starts, ends - starts
+
+
+def _substitution_starts(bits, size):
+    """
+    Start positions of the `size`-bit all-zero blocks a left-to-right scan
+    substitutes: each zero run is cut into whole blocks from its start.
+    """
+    starts, lengths = _zero_runs(bits)
+    counts = lengths // size
+    starts, counts = starts[counts > 0], counts[counts > 0]
+    run_index = np.repeat(np.arange(len(counts)), counts)
+    first_block = np.repeat(np.cumsum(counts) - counts, counts)
+    return starts[run_index] + size * (np.arange(len(run_index)) - first_block)
+
+
+def _trailing_zeros(bits):
+    """Number of zeros at the end of `bits`."""
+    if not len(bits):
+        return 0
+    last_one = np.argmax(bits[::-1])
+    return len(bits) if bits[-1 - last_one] == 0 else int(last_one)
+
+
+def _ami(bits, state):
+    return _bipolar_levels(bits, np.zeros_like(bits), state)
+
+
+def _b8zs(bits, state):
+    flips = bits.copy()
+    violations = np.zeros_like(bits)
+    # 00000000 -> 000VB0VB
+    blocks = _substitution_starts(bits, 8)
+    violations[blocks + 3] = 1
+    flips[blocks + 4] = 1
+    violations[blocks + 6] = 1
+    flips[blocks + 7] = 1
+    return _bipolar_levels(flips, violations, state)
+
+
+def _hdb3(bits, state):
+    flips = bits.copy()
+    violations = np.zeros_like(bits)
+    # 0000 -> B00V after an even number of ones since the last
+    # substitution, 000V after an odd number.
+    blocks = _substitution_starts(bits, 4)
+    ones_before = np.concatenate(([0], np.cumsum(bits, dtype=np.int64)))
+    previous_end = np.concatenate(([0], blocks[:-1] + 4))
+    ones_between = ones_before[blocks] - ones_before[previous_end]
+    if len(blocks):
+        ones_between[0] += state.ones_parity
+        state.ones_parity = int(ones_before[-1] - ones_before[blocks[-1] + 4]) % 2
+    else:
+        state.ones_parity = int(state.ones_parity + ones_before[-1]) % 2
+    flips[blocks[ones_between % 2 == 0]] = 1
+    violations[blocks + 3] = 1
+    return _bipolar_levels(flips, violations, state)
+
+
+_KERNELS = {
+    'Unipolar': _unipolar,
+    'NRZ-L': _nrz_l,
+    'NRZ-I': _nrz_i,
+    'RZ': _rz,
+    'Manchester': _manchester,
+    'Differential Manchester': _diff_manchester,
+    'AMI': _ami,
+    'B8ZS': _b8zs,
+    'HDB3': _hdb3,
+}
+
+
+def encode_levels(scheme, data, state=None):
+    """
+    Returns the level array (`SAMPLES_PER_BIT[scheme]` per bit) for `data`.
+    `state`, if given, is the line state to start from; it is left at the
+    state after the last bit.
+    """
+    return _KERNELS[scheme](to_bits(data), LineState() if state is None else state)
+
+
+def encode(scheme, data, state=None):
+    """Encodes `data` with the named scheme and returns `(x, y)` arrays."""
+    levels = encode_levels(scheme, data, state)
+    return level_points(levels, SAMPLES_PER_BIT[scheme], 0, START_LEVELS[scheme])
+
+
+def encode_waveform(scheme, data):
+    """Encodes `data` with the named scheme and returns a `Waveform`."""
+    levels = encode_levels(scheme, data)
+    return Waveform.from_levels(levels, SAMPLES_PER_BIT[scheme], START_LEVELS[scheme])
+
+
+# --- STREAMING ---
+
+class StreamEncoder:
+    """
+    Encodes an unbounded bitstream one chunk at a time.
+
+    Each `feed()` returns the `(x, y)` segment for the bits that are fully
+    determined so far; `flush()` returns whatever is still held back at the
+    end of the stream. The first segment carries the leading breakpoint, so
+    concatenating every segment reproduces `encode()` on the whole stream.
+    `feed_levels()` / `flush_levels()` return the raw level arrays instead.
+    Memory use depends on the chunk size only, never on the stream length.
+    """
+
+    def __init__(self, scheme, state=None):
+        self.scheme = scheme
+        self.samples_per_bit = SAMPLES_PER_BIT[scheme]
+        self.state = LineState() if state is None else state
+        # Number of bits emitted so far (the time of the next emitted bit).
+        self.position = 0
+        self._started = False
+
+    def feed_levels(self, data):
+        bits = to_bits(data)
+        if self.state.pending_zeros:
+            # Also zeros handed over from another scheme's encoder
+            pending = np.zeros(self.state.pending_zeros, dtype=np.uint8)
+            bits = np.concatenate((pending, bits))
+            self.state.pending_zeros = 0
+        size = SUBSTITUTION_SIZES.get(self.scheme)
+        if size:
+            # Whole blocks of a trailing zero run are already decided; only
+            # the remainder can still grow into another substitution.
+            held = _trailing_zeros(bits) % size
+            self.state.pending_zeros = held
+            bits = bits[:len(bits) - held]
+        return self._levels(bits)
+
+    def flush_levels(self):
+        bits = np.zeros(self.state.pending_zeros, dtype=np.uint8)
+        self.state.pending_zeros = 0
+        return self._levels(bits)
+
+    def feed(self, data):
+        return self._points(self.feed_levels(data))
+
+    def flush(self):
+        return self._points(self.flush_levels())
+
+    def _levels(self, bits):
+        levels = _KERNELS[self.scheme](bits, self.state)
+        self.position += len(bits)
+        return levels
+
+    def _points(self, levels):
+        lead = None if self._started else START_LEVELS[self.scheme]
+        self._started = True
+        offset = self.position - len(levels) // self.samples_per_bit
+        return level_points(levels, self.samples_per_bit, offset, lead)
+
+
+def encode_stream(scheme, chunks, state=None):
+    """
+    Generator version of `StreamEncoder`: yields one `(x, y)` segment per
+    input chunk, then a final segment for the held-back tail. A `PackedBits`
+    is read in its default-sized chunks.
+    """
+    if isinstance(chunks, PackedBits):
+        chunks = chunks.chunks()
+    encoder = StreamEncoder(scheme, state)
+    for chunk in chunks:
+        yield encoder.feed(chunk)
+    yield encoder.flush()
@@ -0,0 +1,208 @@
+"""
+Encoding state shared by both viewers (main.py / kivy_ui.py and app.py).
+
+`EncodingLogic` holds what has to outlive a single encode: the incremental
+encoder of each scheme, the finished-waveform cache, the all-schemes process
+pool, the line statistics of the current input, the open capture file with
+its checkpoint index, and the AMI pulse polarity carried between `get_ami()`
+calls. The `get_*` methods return the `(x, y)`
+breakpoint lists of the original per-bit implementations: B8ZS and HDB3 from
+the vectorized kernels, which index the zero runs up front, and the other
+schemes from the byte tables.
+
+Nothing here imports a GUI toolkit. The modules only some code paths need
+(the process pool, the byte tables, the statistics engine, the capture
+index) are imported on
+first use, so importing this module costs little more than NumPy itself.
+"""
+import numpy as np
+
+from encode_cache import EncodeCache, input_digest
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, LineState, StreamEncoder, encode, to_bits
+from incremental import IncrementalEncoder
+
+
+class EncodingLogic:
+    def __init__(self):
+        self.last_pulse_polarity = -1
+        # One incremental encoder per scheme, so an edit only re-encodes
+        # the bits it actually affects.
+        self.incremental = {}
+        # Finished waveforms by (scheme, input digest), so switching back to
+        # a scheme for the same input is a lookup.
+        self.cache = EncodeCache()
+        # Process pool for encoding every scheme at once, started on first use
+        self._pool = None
+        # Line statistics of each scheme for the input with digest `stats_digest`
+        self.stats = {}
+        self.stats_digest = None
+        # Capture file opened by `open_capture()`, seekable through its index
+        self.capture = None
+
+    def reset(self):
+        self.last_pulse_polarity = -1
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            from parallel_encode import SchemePool
+            self._pool = SchemePool()
+        return self._pool
+
+    def shutdown(self):
+        """Stops the process pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def get_waveform(self, method, data):
+        """
+        Vectorized encode of `data` as a transition-only Waveform. Served
+        from the cache when possible, otherwise resumed from this scheme's
+        previous encoding where the input is unchanged.
+        """
+        return self.cache.get_or_encode(method, data, self._encode_incremental)
+
+    def get_all_waveforms(self, data):
+        """
+        {scheme: Waveform} for every scheme. Cached schemes are looked up,
+        the rest are encoded side by side on the process pool.
+        """
+        digest = input_digest(data)
+        waveforms = {method: self.cache.get(method, digest) for method in SCHEMES}
+        missing = [method for method, waveform in waveforms.items() if waveform is None]
+        if missing:
+            for method, waveform in self.pool.encode_all(data, missing).items():
+                self.cache.put(method, digest, waveform)
+                waveforms[method] = waveform
+        return waveforms
+
+    def open_capture(self, path, bit_order='msb', nbits=None):
+        """
+        Memory-maps a packed capture file for `get_window()`. Its checkpoint
+        index is loaded from the side-car file, or built once in a single
+        streaming pass. Returns the `SeekableCapture`.
+        """
+        from seek_index import open_capture
+        self.capture = open_capture(path, bit_order, nbits)
+        return self.capture
+
+    def get_window(self, method, start, width):
+        """
+        Waveform of bits [start, start + width) of the open capture, timed
+        from its bit 0. Encoded from the nearest checkpoint, so it costs
+        O(width) wherever the window is.
+        """
+        if self.capture is None:
+            raise ValueError("no capture is open")
+        return self.capture.window(method, start, width)
+
+    def get_stats(self, method, data):
+        """
+        Summary of the scheme's line statistics, kept until the input changes.
+        Measured on the levels already encoded for the waveform.
+        """
+        stats = self._stats_for(data)
+        if method not in stats:
+            from line_stats import levels_stats
+            stats[method] = levels_stats(method, self._levels(method, data)).summary()
+        return stats[method]
+
+    def get_all_stats(self, data):
+        """
+        {scheme: summary} for every scheme. The missing ones are measured
+        from the (cached) waveforms side by side on the process pool.
+        """
+        stats = self._stats_for(data)
+        missing = [method for method in SCHEMES if method not in stats]
+        if missing:
+            waveforms = self.get_all_waveforms(data)
+            stats.update(self.pool.stats_all({method: waveforms[method] for method in missing}))
+        return dict(stats)
+
+    def _stats_for(self, data):
+        """The statistics kept so far for `data`; a new input starts afresh."""
+        digest = input_digest(data)
+        if digest != self.stats_digest:
+            self.stats = {}
+            self.stats_digest = digest
+        return self.stats
+
+    def _levels(self, method, data):
+        """
+        The scheme's level array for `data`: its incremental encoder's levels
+        when they are for this input, else the cached waveform expanded.
+        """
+        waveform = self.get_waveform(method, data)
+        encoder = self.incremental.get(method)
+        if encoder is not None and np.array_equal(encoder.bits, to_bits(data)):
+            return encoder.levels
+        return waveform.to_levels(SAMPLES_PER_BIT[method])
+
+    def stream_encoder(self, method):
+        """
+        A `StreamEncoder` for a live stream, starting from the same pulse
+        polarity as the `get_*` methods: AMI continues `last_pulse_polarity`,
+        the scrambled schemes start from -1. The stream keeps its own state
+        from then on.
+        """
+        state = LineState()
+        if method == 'AMI':
+            state.polarity = self.last_pulse_polarity
+        return StreamEncoder(method, state)
+
+    def _encode_incremental(self, method, data):
+        encoder = self.incremental.get(method)
+        if encoder is None:
+            encoder = self.incremental[method] = IncrementalEncoder(method)
+        return encoder.waveform(data)
+
+    def get_unipolar(self, data):
+        return self._table_points('Unipolar', data)
+
+    def get_nrz_l(self, data):
+        return self._table_points('NRZ-L', data)
+
+    def get_nrz_i(self, data):
+        return self._table_points('NRZ-I', data)
+
+    def get_rz(self, data):
+        return self._table_points('RZ', data)
+
+    def get_manchester(self, data):
+        return self._table_points('Manchester', data)
+
+    def get_diff_manchester(self, data):
+        return self._table_points('Differential Manchester', data)
+
+    def get_ami(self, data):
+        return self._table_points('AMI', data)
+
+    def get_b8zs(self, data):
+        return self._substituted_points('B8ZS', data)
+
+    def get_hdb3(self, data):
+        return self._substituted_points('HDB3', data)
+
+    def _table_points(self, method, data):
+        """
+        `(x, y)` breakpoint lists from the byte-table engine. AMI starts
+        from `last_pulse_polarity` and leaves it at its last pulse.
+        """
+        import byte_tables
+        state = LineState()
+        state.polarity = self.last_pulse_polarity
+        x, y = byte_tables.encode(method, data, state)
+        self.last_pulse_polarity = state.polarity
+        return x.tolist(), y.tolist()
+
+    def _substituted_points(self, method, data):
+        """
+        `(x, y)` breakpoint lists for B8ZS/HDB3. The vectorized kernels index
+        every zero run once and substitute its whole blocks, rather than
+        testing each position or walking the input byte by byte. They start
+        from polarity -1 and leave `last_pulse_polarity` at their last pulse.
+        """
+        state = LineState()
+        x, y = encode(method, data, state)
+        self.last_pulse_polarity = state.polarity
+        return x.tolist(), y.tolist()
@@ -0,0 +1,207 @@
+"""
+Streaming exporters for encoded waveforms.
+
+A writer receives level arrays chunk by chunk, as `StreamEncoder.feed_levels()`
+produces them, and appends them to its file; nothing but the current chunk
+is ever held in memory, so captures of any length export in constant
+memory. Formats:
+- `RawWriter` (.i8): bare int8 samples.
+- `NpyWriter` (.npy): a 1-D int8 array; the header is patched with the
+  final length on close, so the file can be `np.load(..., mmap_mode='r')`ed.
+- `VcdWriter` (.vcd): Value Change Dump with one 2-bit two's-complement
+  signal, one time unit per sample, for logic-analyzer tools.
+- `WavWriter` (.wav): 16-bit mono PCM. RIFF caps a file at 4 GiB, about
+  2 * 10^9 samples; longer output raises ValueError before it is written
+  (RF64 is not supported).
+
+Every writer outputs `samples_per_bit` samples per bit, which must be a
+multiple of the scheme's own `SAMPLES_PER_BIT`.
+"""
+import abc
+import wave
+
+import numpy as np
+
+from encoding_core import SAMPLES_PER_BIT, StreamEncoder
+from packed_bits import PackedBits
+
+# Header block reserved by NpyWriter; room for any 64-bit length.
+NPY_HEADER_BYTES = 128
+WAV_SAMPLE_RATE = 48000
+WAV_AMPLITUDE = 0.8
+# RIFF sizes are 32-bit and count the 36 header bytes after the size field
+WAV_MAX_SAMPLES = (0xFFFFFFFF - 36) // 2
+
+
+class LevelWriter(abc.ABC):
+    suffix = '.i8'
+    # Most samples the format can hold, or None for no limit
+    max_samples = None
+
+    def __init__(self, path, scheme, samples_per_bit=None):
+        native = SAMPLES_PER_BIT[scheme]
+        samples_per_bit = samples_per_bit or native
+        if samples_per_bit % native:
+            raise ValueError(f"{scheme} needs a multiple of {native} samples per bit, got {samples_per_bit}")
+        self.path = path
+        self.scheme = scheme
+        self.samples_per_bit = samples_per_bit
+        # Output samples per native level
+        self.repeat = samples_per_bit // native
+        # Output samples written so far
+        self.samples = 0
+        self.closed = False
+        self.open()
+
+    def write(self, levels):
+        levels = np.asarray(levels, dtype=np.int8)
+        self._check_room(len(levels) * self.repeat)
+        self.write_samples(levels)
+        self.samples += len(levels) * self.repeat
+
+    def check_room(self, nbits):
+        """Raises ValueError if `nbits` more bits would not fit the format."""
+        self._check_room(nbits * self.samples_per_bit)
+
+    def _check_room(self, samples):
+        if self.max_samples is not None and self.samples + samples > self.max_samples:
+            raise ValueError(
+                f"{self.suffix} holds at most {self.max_samples:,} samples, "
+                f"{self.samples + samples:,} needed"
+            )
+
+    @abc.abstractmethod
+    def write_samples(self, levels):
+        """Writes `levels`, each repeated `self.repeat` times."""
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.closed:
+            self.close()
+
+
+class RawWriter(LevelWriter):
+    suffix = '.i8'
+
+    def open(self):
+        self.file = open(self.path, 'wb')
+
+    def write_samples(self, levels):
+        self.file.write(np.repeat(levels, self.repeat).tobytes() if self.repeat > 1 else levels.tobytes())
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+class NpyWriter(RawWriter):
+    suffix = '.npy'
+
+    def open(self):
+        super().open()
+        self.file.write(self._header())
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header())
+        super().close()
+
+    def _header(self):
+        """Version 1.0 .npy header for `self.samples` int8 values, padded to a fixed size."""
+        header = "{'descr': '|i1', 'fortran_order': False, 'shape': (%d,), }" % self.samples
+        prefix = np.lib.format.magic(1, 0)
+        body = header.ljust(NPY_HEADER_BYTES - len(prefix) - 3) + '\n'
+        return prefix + len(body).to_bytes(2, 'little') + body.encode('latin1')
+
+
+class VcdWriter(LevelWriter):
+    suffix = '.vcd'
+    # Two's-complement values, left-extended to the 2-bit signal width
+    VALUES = {1: 'b1', 0: 'b0', -1: 'b11'}
+
+    def __init__(self, path, scheme, samples_per_bit=None, timescale='1 ns'):
+        self.timescale = timescale
+        self.last = None
+        super().__init__(path, scheme, samples_per_bit)
+
+    def open(self):
+        self.file = open(self.path, 'w')
+        name = self.scheme.replace(' ', '_').replace('-', '_')
+        self.file.write(
+            "$version line code encoder $end\n"
+            f"$comment {self.samples_per_bit} time units per bit $end\n"
+            f"$timescale {self.timescale} $end\n"
+            "$scope module line $end\n"
+            f"$var wire 2 ! {name} $end\n"
+            "$upscope $end\n"
+            "$enddefinitions $end\n"
+        )
+
+    def write_samples(self, levels):
+        if not len(levels):
+            return
+        changes = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+        if self.last is None or levels[0] != self.last:
+            changes = np.concatenate(([0], changes))
+        times = (self.samples + changes * self.repeat).tolist()
+        values = levels[changes].tolist()
+        self.file.write(''.join(f"#{t}\n{self.VALUES[v]} !\n" for t, v in zip(times, values)))
+        self.last = int(levels[-1])
+
+    def close(self):
+        # Mark the end of the last sample
+        self.file.write(f"#{self.samples}\n")
+        self.file.close()
+        super().close()
+
+
+class WavWriter(LevelWriter):
+    suffix = '.wav'
+    max_samples = WAV_MAX_SAMPLES
+
+    def __init__(self, path, scheme, samples_per_bit=None, sample_rate=WAV_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        super().__init__(path, scheme, samples_per_bit)
+
+    def open(self):
+        # `wave` patches the frame count into the header on close
+        self.file = wave.open(self.path, 'wb')
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(self.sample_rate)
+
+    def write_samples(self, levels):
+        pcm = (levels.astype('<i2') * int(WAV_AMPLITUDE * 32767)).astype('<i2')
+        self.file.writeframesraw(np.repeat(pcm, self.repeat).tobytes() if self.repeat > 1 else pcm.tobytes())
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+WRITERS = {writer.suffix: writer for writer in (RawWriter, NpyWriter, VcdWriter, WavWriter)}
+
+
+def export(scheme, chunks, writer):
+    """
+    Stream-encodes `chunks` (an iterable of bit chunks, or a `PackedBits`)
+    into `writer` and closes it. Returns the number of bits encoded.
+    """
+    encoder = StreamEncoder(scheme)
+    with writer:
+        if isinstance(chunks, PackedBits):
+            # Refuse a capture too long for the format before writing any of it
+            writer.check_room(len(chunks))
+            chunks = chunks.chunks()
+        for chunk in chunks:
+            writer.write(encoder.feed_levels(chunk))
+        writer.write(encoder.flush_levels())
+    return encoder.position
@@ -0,0 +1,134 @@
+"""
+Incremental re-encoding for live editing of the input.
+
+An `IncrementalEncoder` remembers the bits and levels of the last input it
+encoded, plus a checkpoint of the encoder's `LineState` every
+`CHECKPOINT_INTERVAL` bits. After an edit it resumes from the nearest
+checkpoint before the first changed bit and re-encodes forward only until
+its state matches the old encoding at a checkpoint past the edit; from there
+the old levels are reused as they are. A state that matches up to sign (an
+edit that flipped the NRZ-I level or the AMI polarity) also converges: the
+rest of the old levels is reused negated. A one-character edit in a long
+input therefore re-encodes a few thousand bits instead of the whole string.
+"""
+import bisect
+
+import numpy as np
+
+from encoding_core import (
+    LineState, SAMPLES_PER_BIT, SIGNED_STATE, START_LEVELS, StreamEncoder,
+    Y_DTYPE, to_bits
+)
+from waveform import Waveform
+
+CHECKPOINT_INTERVAL = 4096
+
+
+class Checkpoint:
+    """
+    Encoder state after reading `position` input bits, of which `emitted`
+    have been turned into levels (the rest are held-back zeros).
+    """
+    __slots__ = ('position', 'emitted', 'state')
+
+    def __init__(self, position, emitted, state):
+        self.position = position
+        self.emitted = emitted
+        self.state = state
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    diff = np.flatnonzero(a[:n] != b[:n])
+    return int(diff[0]) if len(diff) else n
+
+
+def _common_suffix(a, b, limit):
+    if limit <= 0:
+        return 0
+    diff = np.flatnonzero(a[len(a) - limit:][::-1] != b[len(b) - limit:][::-1])
+    return int(diff[0]) if len(diff) else limit
+
+
+class IncrementalEncoder:
+    def __init__(self, scheme, interval=CHECKPOINT_INTERVAL):
+        self.scheme = scheme
+        self.interval = interval
+        self.samples_per_bit = SAMPLES_PER_BIT[scheme]
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.levels = np.zeros(0, dtype=Y_DTYPE)
+        self.checkpoints = [Checkpoint(0, 0, LineState())]
+        # Input bits actually re-encoded by the last update().
+        self.last_reencoded = 0
+
+    def update(self, data):
+        """Encodes `data`, reusing as much of the previous encoding as possible."""
+        new = to_bits(data)
+        old = self.bits
+        if len(new) == len(old) and np.array_equal(new, old):
+            self.last_reencoded = 0
+            return self.levels
+
+        changed_from = _common_prefix(old, new)
+        same_tail = _common_suffix(old, new, min(len(old), len(new)) - changed_from)
+        changed_to = len(new) - same_tail
+        shift = len(new) - len(old)
+        spb = self.samples_per_bit
+
+        # Resume from the last checkpoint not after the first changed bit.
+        positions = [c.position for c in self.checkpoints]
+        start_index = bisect.bisect_right(positions, changed_from) - 1
+        start = self.checkpoints[start_index]
+        checkpoints = self.checkpoints[:start_index + 1]
+        encoder = StreamEncoder(self.scheme, start.state.copy())
+        encoder.position = start.emitted
+        pieces = [self.levels[:start.emitted * spb]]
+
+        # Old checkpoints inside the unchanged tail are where the new
+        # encoding may converge with the old one.
+        candidate = bisect.bisect_left(positions, max(changed_to, start.position + 1) - shift)
+        field = SIGNED_STATE.get(self.scheme)
+        position = start.position
+        converged = None
+        while position < len(new):
+            target = min(position + self.interval, len(new))
+            while candidate < len(positions) and positions[candidate] + shift <= position:
+                candidate += 1
+            at_candidate = candidate < len(positions) and positions[candidate] + shift <= target
+            if at_candidate:
+                target = positions[candidate] + shift
+            pieces.append(encoder.feed_levels(new[position:target]))
+            position = target
+            if at_candidate:
+                old_state = self.checkpoints[candidate].state
+                if encoder.state == old_state:
+                    converged, sign = candidate, 1
+                    break
+                if field and encoder.state == old_state.negated(field):
+                    converged, sign = candidate, -1
+                    break
+            checkpoints.append(Checkpoint(position, encoder.position, encoder.state.copy()))
+
+        if converged is None:
+            pieces.append(encoder.flush_levels())
+        else:
+            reused = self.checkpoints[converged]
+            tail = self.levels[reused.emitted * spb:]
+            pieces.append(tail if sign == 1 else -tail)
+            emitted_shift = encoder.position - reused.emitted
+            checkpoints.extend(
+                Checkpoint(c.position + shift, c.emitted + emitted_shift,
+                           c.state if sign == 1 else c.state.negated(field))
+                for c in self.checkpoints[converged:]
+            )
+
+        self.last_reencoded = position - start.position
+        self.bits = new.copy()
+        self.levels = np.concatenate(pieces).astype(Y_DTYPE, copy=False)
+        self.checkpoints = checkpoints
+        return self.levels
+
+    def waveform(self, data):
+        """`update()` followed by conversion to a transition-only Waveform."""
+        levels = self.update(data)
+        return Waveform.from_levels(levels, self.samples_per_bit, START_LEVELS[self.scheme])
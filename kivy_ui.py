@@ -0,0 +1,777 @@
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.textinput import TextInput
+from kivy.uix.button import Button
+from kivy.uix.togglebutton import ToggleButton
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+from kivy.graphics import (
+    Color, InstructionGroup, Line, Mesh, PopMatrix, PushMatrix, Rectangle, Translate
+)
+from kivy.graphics.scissor_instructions import ScissorPop, ScissorPush
+from kivy.metrics import dp
+from kivy.core.window import Window
+from kivy.clock import Clock
+from kivy.logger import Logger
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import re
+
+import numpy as np
+
+from encoding_core import SCHEMES
+from encoding_logic import EncodingLogic
+from line_stats import format_stats, format_stats_table
+from profiling import StageProfiler, format_frame
+from waveform import grid_step
+
+# Bit-boundary grid lines closer together than this are aggregated.
+GRID_MIN_SPACING = dp(6)
+
+# Zoomed views are assembled from tiles this many pixels wide, each
+# rendered once per (scheme, zoom level, tile index) and kept in an LRU.
+TILE_PX = 256
+TILE_CACHE_SIZE = 64
+
+# Encodes still running after this many seconds show a progress message.
+PROGRESS_DELAY = 0.15
+
+# The statistics panel is measured once the input has been left alone for
+# this many seconds, not on every keystroke; until then it is dimmed.
+STATS_DELAY = 0.3
+
+# Zoom level z shows 2 ** z bits per pixel; this is the deepest zoom-in.
+MIN_ZOOM_LEVEL = -6
+
+# Pseudo-scheme selecting the stacked view of every scheme at once.
+ALL_SCHEMES = 'All Schemes'
+
+# Socket the Live toggle listens on (see live_stream.py); its default
+# address when unset.
+LIVE_ADDRESS_ENV = 'ENCODER_LIVE_ADDRESS'
+
+
+class TileCache:
+    """
+    LRU cache of pre-rendered waveform tiles keyed by
+    (scheme, zoom level, tile index).
+    """
+
+    def __init__(self, max_tiles=TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def get(self, key):
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+
+    def put(self, key, tile):
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def clear(self):
+        self._tiles.clear()
+
+
+class WaveformCanvas(Widget):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.waveform = None
+        self.scheme = None
+        # Viewport: None fits the whole waveform, otherwise 2 ** zoom_level
+        # bits per pixel starting at bit view_start.
+        self.zoom_level = None
+        self.view_start = 0.0
+        self.tile_cache = TileCache()
+        self._touches = {}
+        self._pinch_distance = None
+        self._build_instructions()
+        self._redraw_background()
+        self.bind(size=self._redraw_background, pos=self._redraw_background)
+        # Tiles hold absolute y pixels, so any layout change invalidates them.
+        self.bind(size=self._invalidate_tiles, pos=self._invalidate_tiles)
+        # Re-layout the current waveform on resize, at most once per frame.
+        self._relayout = Clock.create_trigger(lambda dt: self.redraw())
+        self.bind(size=self._relayout, pos=self._relayout)
+
+    def _build_instructions(self):
+        """
+        Creates the canvas instructions once. Redraws only replace their
+        vertices, so no Color/Line objects are allocated per frame.
+        - fitted view: the grid mesh, the zero line and the signal line.
+        - zoomed view: the tile layer, refilled with cached tiles and clipped
+          to the plot area, plus the same zero line.
+        """
+        self._grid_color = Color(0.85, 0.85, 0.85, 1)
+        self._grid_mesh = Mesh(mode='lines')
+        self._scissor = ScissorPush()
+        self._tile_layer = InstructionGroup()
+        self._zero_color = Color(0.2, 0.2, 0.2, 1)
+        self._zero_line = Line(width=1)
+        self._signal_color = Color(0.1, 0.4, 0.9, 1)
+        self._signal_line = Line(width=2)
+        for instruction in (
+            self._grid_color, self._grid_mesh, self._scissor, self._tile_layer,
+            self._zero_color, self._zero_line, self._signal_color, self._signal_line,
+            ScissorPop()
+        ):
+            self.canvas.add(instruction)
+
+    def _redraw_background(self, *args):
+        if not hasattr(self, '_bg_instr'):
+            with self.canvas.before:
+                Color(1, 1, 1, 1)
+                self._bg_instr = Rectangle(pos=self.pos, size=self.size)
+        self._bg_instr.pos = self.pos
+        self._bg_instr.size = self.size
+
+    def _invalidate_tiles(self, *args):
+        self.tile_cache.clear()
+
+    def plot_area(self):
+        padding = dp(20)
+        plot_x0 = self.x + padding
+        plot_y0 = self.y + padding
+        plot_w = max(1.0, self.width - 2 * padding)
+        plot_h = max(1.0, self.height - 2 * padding)
+        return plot_x0, plot_y0, plot_w, plot_h
+
+    def draw_waveform(self, waveform, scheme=None, prepared=None):
+        """
+        Draws the waveform in the current viewport: scaled into the widget
+        when fitted, or assembled from cached tiles when zoomed in.
+        `prepared` is an optional `prepare_fitted()` result computed off the
+        UI thread; it is used when the layout has not changed since.
+
+        The cost depends on the widget width, not on the input length: the
+        signal is min/max-decimated to one stroke per pixel column and bit
+        boundaries are aggregated to a coarser grid once they would sit less
+        than GRID_MIN_SPACING apart. Frame-time target: any input redraws
+        within one 60 Hz frame (16 ms) on a mid-range Android phone.
+        """
+        self.waveform = waveform
+        self.scheme = scheme
+        self.redraw(prepared)
+
+    def reset_view(self):
+        """Back to the fitted view."""
+        self.zoom_level = None
+        self.view_start = 0.0
+
+    def redraw(self, prepared=None):
+        self._grid_mesh.vertices, self._grid_mesh.indices = [], []
+        self._tile_layer.clear()
+        self._zero_line.points = []
+        self._signal_line.points = []
+
+        if self.waveform is None or not len(self.waveform):
+            return
+        # The waveform may have shrunk under a zoomed view since the last draw
+        if self.zoom_level is not None:
+            if 2.0 ** self.zoom_level >= self._fit_bits_per_px():
+                self.reset_view()
+            else:
+                self._clamp_view()
+        if self.zoom_level is None:
+            self._draw_fitted(prepared)
+        else:
+            self._draw_tiles()
+
+    def prepare_fitted(self, waveform, area):
+        """
+        Pixel geometry of the fitted view for the plot `area`. Pure NumPy and
+        list work with no Kivy calls, so it can run on a worker thread.
+        """
+        # Determine ranges
+        bits_length = int(waveform.end)
+        x_min, x_max = 0, waveform.end
+        y_abs_max = max(1, waveform.max_abs_level())
+
+        plot_x0, plot_y0, plot_w, plot_h = area
+
+        def to_px(x, y):
+            if x_max == 0:
+                sx = plot_x0
+            else:
+                sx = plot_x0 + (x - x_min) / (x_max - x_min) * plot_w
+            sy = plot_y0 + (y + y_abs_max) / (2 * y_abs_max) * plot_h
+            return sx, sy
+
+        # Vertical bit boundaries, every `step` bits when they get dense
+        step = grid_step(bits_length, plot_w, GRID_MIN_SPACING)
+        grid_x, _ = to_px(np.arange(0, bits_length + 1, step), 0)
+        grid = grid_mesh(grid_x, to_px(0, -y_abs_max)[1], to_px(0, y_abs_max)[1])
+
+        # Horizontal zero line
+        x1, y1 = to_px(0, 0)
+        x2, y2 = to_px(x_max, 0)
+
+        # Signal, decimated to the pixel columns of the plot area
+        x, y = waveform.decimate(plot_w)
+        pts = np.empty(2 * len(x))
+        pts[0::2], pts[1::2] = to_px(x, y.astype(np.float64))
+
+        return {'area': area, 'grid': grid, 'zero': [x1, y1, x2, y2], 'signal': pts.tolist()}
+
+    def _draw_fitted(self, prepared=None):
+        if prepared is None or prepared['area'] != self.plot_area():
+            prepared = self.prepare_fitted(self.waveform, self.plot_area())
+
+        # The 2 px signal line may overhang the plot area by a pixel
+        self._scissor.pos = self.pos
+        self._scissor.size = self.size
+        self._grid_mesh.vertices, self._grid_mesh.indices = prepared['grid']
+        self._zero_line.points = prepared['zero']
+        if len(prepared['signal']) >= 4:
+            self._signal_line.points = prepared['signal']
+
+    # --- PAN / ZOOM ---
+
+    def _fit_bits_per_px(self):
+        return self.waveform.end / self.plot_area()[2]
+
+    def _bits_per_px(self):
+        if self.zoom_level is None:
+            return self._fit_bits_per_px()
+        return 2.0 ** self.zoom_level
+
+    def _clamp_view(self):
+        span = self.plot_area()[2] * self._bits_per_px()
+        self.view_start = min(max(0.0, self.view_start), max(0.0, self.waveform.end - span))
+
+    def zoom_by(self, factor, anchor_x):
+        """
+        Zooms in (factor > 1) or out around the pixel column `anchor_x`,
+        snapping to the nearest power-of-two zoom level.
+        """
+        if self.waveform is None or not len(self.waveform):
+            return
+        plot_x0 = self.plot_area()[0]
+        old_bpp = self._bits_per_px()
+        level = max(MIN_ZOOM_LEVEL, round(math.log2(old_bpp / factor)))
+        if 2.0 ** level >= self._fit_bits_per_px():
+            self.reset_view()
+        else:
+            anchor_bit = self.view_start + (anchor_x - plot_x0) * old_bpp
+            self.zoom_level = level
+            self.view_start = anchor_bit - (anchor_x - plot_x0) * 2.0 ** level
+            self._clamp_view()
+        self.redraw()
+
+    def pan_by(self, dx):
+        """Drags the view by `dx` pixels."""
+        if self.zoom_level is None:
+            return
+        self.view_start -= dx * self._bits_per_px()
+        self._clamp_view()
+        self.redraw()
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            self.zoom_by(2.0 if touch.button == 'scrolldown' else 0.5, touch.x)
+            return True
+        if touch.is_double_tap:
+            self.reset_view()
+            self.redraw()
+            return True
+        touch.grab(self)
+        self._touches[touch.uid] = touch.pos
+        if len(self._touches) == 2:
+            self._pinch_distance = self._touch_distance()
+        return True
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        if len(self._touches) == 1:
+            self.pan_by(touch.x - self._touches[touch.uid][0])
+        self._touches[touch.uid] = touch.pos
+        if len(self._touches) == 2 and self._pinch_distance:
+            # Zoom one power-of-two level per factor-two change in spread.
+            ratio = self._touch_distance() / self._pinch_distance
+            if ratio >= math.sqrt(2) or ratio <= 1 / math.sqrt(2):
+                centre = sum(p[0] for p in self._touches.values()) / 2
+                self.zoom_by(2.0 if ratio > 1 else 0.5, centre)
+                self._pinch_distance = self._touch_distance()
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        self._touches.pop(touch.uid, None)
+        self._pinch_distance = None
+        return True
+
+    def _touch_distance(self):
+        (x1, y1), (x2, y2) = list(self._touches.values())[:2]
+        return max(1.0, math.hypot(x2 - x1, y2 - y1))
+
+    # --- TILES ---
+
+    def _draw_tiles(self):
+        plot_x0, plot_y0, plot_w, plot_h = self.plot_area()
+        bpp = self._bits_per_px()
+        tile_bits = TILE_PX * bpp
+        view_end = min(self.waveform.end, self.view_start + plot_w * bpp)
+        first = int(self.view_start // tile_bits)
+        last = int(view_end // tile_bits)
+
+        self._scissor.pos = (int(plot_x0), int(plot_y0))
+        self._scissor.size = (int(plot_w), int(plot_h))
+        for index in range(first, last + 1):
+            key = (self.scheme, self.zoom_level, index)
+            tile = self.tile_cache.get(key)
+            if tile is None:
+                tile = self._render_tile(index, bpp)
+                self.tile_cache.put(key, tile)
+            # Tiles are drawn in tile-local x, so panning only moves them.
+            group, translate = tile
+            translate.x = plot_x0 + (index * tile_bits - self.view_start) / bpp
+            self._tile_layer.add(group)
+
+        # Horizontal zero line
+        zero_y = plot_y0 + plot_h / 2
+        self._zero_line.points = [plot_x0, zero_y, plot_x0 + (view_end - self.view_start) / bpp, zero_y]
+
+    def _render_tile(self, index, bpp):
+        """
+        Grid and decimated signal for one tile, in tile-local pixels. Returns
+        the tile's instruction group and the Translate that positions it.
+        """
+        _, plot_y0, _, plot_h = self.plot_area()
+        waveform = self.waveform
+        y_abs_max = max(1, waveform.max_abs_level())
+        t0 = index * TILE_PX * bpp
+        t1 = min(waveform.end, t0 + TILE_PX * bpp)
+
+        def to_py(y):
+            return plot_y0 + (y + y_abs_max) / (2 * y_abs_max) * plot_h
+
+        translate = Translate(0, 0)
+        tile = InstructionGroup()
+        tile.add(PushMatrix())
+        tile.add(translate)
+        tile.add(Color(0.85, 0.85, 0.85, 1))
+        step = grid_step(TILE_PX * bpp, TILE_PX, GRID_MIN_SPACING)
+        grid_x = (np.arange(int(math.ceil(t0 / step)) * step, int(t1) + 1, step) - t0) / bpp
+        vertices, indices = grid_mesh(grid_x, to_py(-y_abs_max), to_py(y_abs_max))
+        tile.add(Mesh(vertices=vertices, indices=indices, mode='lines'))
+
+        tile.add(Color(0.1, 0.4, 0.9, 1))
+        x, y = waveform.decimate(math.ceil((t1 - t0) / bpp), t0, t1)
+        pts = np.empty(2 * len(x))
+        pts[0::2] = (x - t0) / bpp
+        pts[1::2] = to_py(y.astype(np.float64))
+        tile.add(Line(points=pts.tolist(), width=2))
+        tile.add(PopMatrix())
+        return tile, translate
+
+
+def grid_mesh(xs, y1, y2):
+    """
+    `Mesh` vertices and indices (mode 'lines') for vertical lines at the
+    pixel columns `xs`, all running from y1 to y2.
+    """
+    vertices = np.zeros((len(xs), 2, 4))
+    vertices[:, :, 0] = np.asarray(xs)[:, None]
+    vertices[:, 0, 1] = y1
+    vertices[:, 1, 1] = y2
+    return vertices.ravel().tolist(), list(range(2 * len(xs)))
+
+
+class SmallMultiples(BoxLayout):
+    """One row per scheme: its name and a WaveformCanvas of its own."""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', spacing=dp(2), **kwargs)
+        self.canvases = {}
+        for method in SCHEMES:
+            row = BoxLayout(orientation='horizontal')
+            row.add_widget(Label(text=method, size_hint_x=None, width=dp(170), font_size='12sp'))
+            self.canvases[method] = WaveformCanvas()
+            row.add_widget(self.canvases[method])
+            self.add_widget(row)
+
+    def plot_areas(self):
+        return {method: canvas.plot_area() for method, canvas in self.canvases.items()}
+
+    def draw_waveforms(self, waveforms, prepared=None):
+        for method, canvas in self.canvases.items():
+            canvas.draw_waveform(waveforms[method], scheme=method,
+                                 prepared=None if prepared is None else prepared[method])
+
+
+class RootUI(BoxLayout):
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', spacing=dp(8), padding=dp(10), **kwargs)
+
+        # Top input row
+        input_row = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(48), spacing=dp(8))
+        input_row.add_widget(Label(text='Enter Binary String:', size_hint_x=None, width=dp(170)))
+        self.binary_input = TextInput(text='0100000000110', multiline=False)
+        input_row.add_widget(self.binary_input)
+        self.status = Label(text='', size_hint_x=None, width=dp(110))
+        input_row.add_widget(self.status)
+        self.profile_toggle = ToggleButton(text='Profile', size_hint_x=None, width=dp(80))
+        input_row.add_widget(self.profile_toggle)
+        self.live_toggle = ToggleButton(text='Live', size_hint_x=None, width=dp(70))
+        input_row.add_widget(self.live_toggle)
+        self.add_widget(input_row)
+
+        # Buttons grid
+        buttons = [
+            'Unipolar', 'NRZ-L', 'NRZ-I', 'RZ', 'Manchester',
+            'Differential Manchester', 'AMI', 'B8ZS', 'HDB3', ALL_SCHEMES
+        ]
+        grid = GridLayout(cols=3, size_hint_y=None, spacing=dp(6), padding=(0, dp(4)))
+        grid.bind(minimum_height=grid.setter('height'))
+        self.buttons = {}
+        for name in buttons:
+            btn = Button(text=name, size_hint_y=None, height=dp(44), background_normal='', background_color=(0, 0, 0, 1), color=(1, 1, 1, 1), bold=True)
+            btn.bind(on_release=lambda inst, n=name: self.on_select(n))
+            grid.add_widget(btn)
+            self.buttons[name] = btn
+        self.add_widget(grid)
+
+        # Plot area: one canvas, or the stacked view of every scheme, under
+        # the profiling overlay
+        self.plot_holder = FloatLayout(size_hint=(1, 1))
+        self.canvas_widget = WaveformCanvas(pos_hint={'x': 0, 'y': 0})
+        self.multiples = SmallMultiples(pos_hint={'x': 0, 'y': 0})
+        self.profile_overlay = Label(text='', font_name='RobotoMono-Regular', font_size='12sp',
+                                     color=(0.7, 0, 0, 1), size_hint=(None, None),
+                                     pos_hint={'right': 1, 'top': 1}, opacity=0)
+        self.profile_overlay.bind(texture_size=self.profile_overlay.setter('size'))
+        self.plot_holder.add_widget(self.canvas_widget)
+        self.plot_holder.add_widget(self.profile_overlay)
+        self.add_widget(self.plot_holder)
+
+        # Statistics panel, as tall as its text
+        self.stats_label = Label(text='', font_name='RobotoMono-Regular', font_size='12sp',
+                                 size_hint_y=None, halign='left', valign='top')
+        self.stats_label.bind(
+            width=lambda inst, w: setattr(inst, 'text_size', (w, None)),
+            texture_size=lambda inst, size: setattr(inst, 'height', size[1]),
+        )
+        self.add_widget(self.stats_label)
+
+        # Logic
+        self.logic = EncodingLogic()
+        # Per-stage timings of each redraw, shown over the plot when enabled
+        self.profiler = StageProfiler.from_environment('kivy')
+        self.profile_toggle.state = 'down' if self.profiler.enabled else 'normal'
+        self.profile_overlay.opacity = 1 if self.profiler.enabled else 0
+        self.profile_toggle.bind(state=self.on_profile_toggle)
+        self.active_method = None
+        self.drawn_input = None
+        # Live stream shown instead of the typed input while the toggle is down
+        self.live = None
+        self._live_event = None
+        self.live_toggle.bind(state=self.on_live_toggle)
+
+        # Encoding runs on a single worker thread (which also keeps
+        # EncodingLogic single-threaded). Every request bumps the generation;
+        # results from an older generation are dropped.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.generation = 0
+        self._future = None
+        self._stats_future = None
+
+        # Initial plot
+        self.on_select('Unipolar')
+
+        # Live re-encode of the active scheme as the user types
+        self.binary_input.bind(text=self.on_text)
+
+    def validate(self, s):
+        if not re.match(r'^[01]+$', s):
+            return False
+        return True
+
+    def on_profile_toggle(self, instance, state):
+        enabled = state == 'down'
+        self.profiler.set_enabled(enabled)
+        self.profile_overlay.opacity = 1 if enabled else 0
+        self.profile_overlay.text = format_frame(self.profiler.last) if enabled else ''
+
+    def on_text(self, instance, text):
+        if self.active_method and self.live is None:
+            self.on_select(self.active_method)
+
+    def on_select(self, method):
+        """
+        Queues an encode of the current input and returns at once. A newer
+        request cancels this one if it has not started, and otherwise makes
+        its result stale. While live, switches the stream to the scheme.
+        """
+        if self.live is not None:
+            if method != ALL_SCHEMES:
+                self._switch_live(method)
+            return
+        s = self.binary_input.text.strip()
+        frame = self.profiler.frame(method, bits=len(s))
+        self.generation += 1
+        generation = self.generation
+        for future in (self._future, self._stats_future):
+            if future is not None:
+                future.cancel()
+        # Fitted views are laid out on the worker too; zoomed views only
+        # need their cached tiles.
+        if method == ALL_SCHEMES:
+            area = self.multiples.plot_areas() if self.multiples.parent else None
+        else:
+            area = self.canvas_widget.plot_area() if self.canvas_widget.zoom_level is None else None
+        self._future = self.executor.submit(self._encode_job, generation, method, s, area, frame)
+        # Only jobs still running after PROGRESS_DELAY show the indicator
+        Clock.schedule_once(lambda dt: self._show_progress(generation, len(s)), PROGRESS_DELAY)
+
+    def _encode_job(self, generation, method, s, area, frame):
+        """Worker thread: validate, encode and lay out; no Kivy calls here."""
+        if generation != self.generation:
+            return
+        with frame.stage('validate'):
+            valid = self.validate(s)
+        if not valid:
+            Clock.schedule_once(lambda dt: self._on_invalid(generation))
+            return
+        try:
+            if method == ALL_SCHEMES:
+                with frame.stage('encode') as record:
+                    waveform = self.logic.get_all_waveforms(s)
+                    record['points'] = sum(len(w) for w in waveform.values())
+                if generation != self.generation:
+                    return
+                with frame.stage('layout') as record:
+                    prepared = None if area is None else {
+                        name: self.canvas_widget.prepare_fitted(waveform[name], area[name])
+                        for name in SCHEMES
+                    }
+                    if prepared is not None:
+                        record['points'] = sum(len(p['signal']) // 2 for p in prepared.values())
+            else:
+                with frame.stage('encode') as record:
+                    waveform = self.logic.get_waveform(method, s)
+                    record['points'] = len(waveform)
+                if generation != self.generation:
+                    return
+                with frame.stage('layout') as record:
+                    prepared = None if area is None else self.canvas_widget.prepare_fitted(waveform, area)
+                    if prepared is not None:
+                        record['points'] = len(prepared['signal']) // 2
+        except Exception:
+            Logger.exception('EncodingVisualizer: encoding failed')
+            Clock.schedule_once(lambda dt: self._on_invalid(generation))
+            return
+        Clock.schedule_once(lambda dt: self._on_encoded(generation, method, s, waveform, prepared, frame))
+
+    def _show_progress(self, generation, bits):
+        if generation == self.generation and self._future is not None and not self._future.done():
+            self.status.text = f'Encoding {bits:,} bits...'
+
+    def _on_invalid(self, generation):
+        if generation != self.generation:
+            return
+        self.status.text = ''
+        # Visual feedback for invalid input
+        self.binary_input.background_color = (1, 0.8, 0.8, 1)
+
+    def _on_encoded(self, generation, method, s, waveform, prepared, frame):
+        """UI thread: only restyles and uploads the finished geometry."""
+        if generation != self.generation:
+            return
+        self.status.text = ''
+        self.binary_input.background_color = (1, 1, 1, 1)
+
+        self._highlight(method)
+
+        # A new input invalidates every cached tile
+        if s != self.drawn_input:
+            self.canvas_widget.tile_cache.clear()
+            for canvas in self.multiples.canvases.values():
+                canvas.tile_cache.clear()
+            self.drawn_input = s
+
+        self._show_view(self.multiples if method == ALL_SCHEMES else self.canvas_widget)
+        with frame.stage('draw'):
+            if method == ALL_SCHEMES:
+                self.multiples.draw_waveforms(waveform, prepared)
+            else:
+                self.canvas_widget.draw_waveform(waveform, scheme=method, prepared=prepared)
+        frame.finish()
+        if self.profiler.enabled:
+            self.profile_overlay.text = format_frame(self.profiler.last)
+        self.stats_label.opacity = 0.5
+        Clock.schedule_once(lambda dt: self._request_stats(generation, method, s), STATS_DELAY)
+
+    def _request_stats(self, generation, method, s):
+        if generation == self.generation:
+            self._stats_future = self.executor.submit(self._stats_job, generation, method, s)
+
+    def _stats_job(self, generation, method, s):
+        """Worker thread: the panel text, timed as a frame of its own."""
+        if generation != self.generation:
+            return
+        frame = self.profiler.frame(f'{method} stats', bits=len(s))
+        try:
+            with frame.stage('stats'):
+                if method == ALL_SCHEMES:
+                    text = format_stats_table(self.logic.get_all_stats(s))
+                else:
+                    text = format_stats(self.logic.get_stats(method, s))
+        except Exception:
+            Logger.exception('EncodingVisualizer: statistics failed')
+            return
+        Clock.schedule_once(lambda dt: self._on_stats(generation, text, frame))
+
+    def _on_stats(self, generation, text, frame):
+        if generation != self.generation:
+            return
+        self.stats_label.text = text
+        self.stats_label.opacity = 1
+        frame.finish()
+        if self.profiler.enabled:
+            self.profile_overlay.text = format_frame(self.profiler.last)
+
+    def _highlight(self, method):
+        """Marks the button of `method` as the active one."""
+        if self.active_method:
+            self.buttons[self.active_method].background_color = (0, 0, 0, 1)
+            self.buttons[self.active_method].color = (1, 1, 1, 1)
+        self.active_method = method
+        self.buttons[method].background_color = (1, 0, 0, 1)
+        self.buttons[method].color = (1, 1, 1, 1)
+
+    def _show_view(self, view):
+        other = self.canvas_widget if view is self.multiples else self.multiples
+        if view.parent is None:
+            self.plot_holder.remove_widget(other)
+            # Below the overlay
+            self.plot_holder.add_widget(view, index=len(self.plot_holder.children))
+
+    def on_live_toggle(self, instance, state):
+        if state == 'down':
+            method = self.active_method
+            self._start_live(SCHEMES[0] if method in (None, ALL_SCHEMES) else method)
+        elif self.live is not None:
+            self.stop_live()
+            # Back to the typed input
+            self.on_select(self.active_method)
+
+    def _start_live(self, method):
+        """
+        Listens on $ENCODER_LIVE_ADDRESS and shows the last window of the
+        stream, scrolling as bits arrive. The stream keeps one line state from
+        the selected scheme's current polarity; frames the UI has no time for
+        are dropped by the stream, never queued.
+        """
+        from live_stream import DEFAULT_ADDRESS, LiveStream
+
+        self.stop_live()
+        address = os.environ.get(LIVE_ADDRESS_ENV) or DEFAULT_ADDRESS
+        try:
+            live = LiveStream(method, address, encoder=self.logic.stream_encoder(method))
+        except ValueError as e:
+            self._live_failed(address, e)
+            return
+        # Binds on the stream's thread, so a slow bind never blocks the UI
+        self.live = live.start(timeout=0)
+        self.stats_label.text = f'Live: starting on {address}'
+        self._live_event = Clock.schedule_interval(self._await_live, 0)
+
+    def _await_live(self, dt):
+        """Switches to the live view once the stream listens, or reports why it can't."""
+        live = self.live
+        if live.error is not None:
+            self._live_failed(live.address, live.error)
+            return
+        if not live.ready.is_set():
+            return
+        self._live_event.cancel()
+        # A pending encode of the typed input must not draw over the stream
+        self.generation += 1
+        self.status.text = ''
+        self._highlight(live.scheme)
+        self._show_view(self.canvas_widget)
+        self.canvas_widget.reset_view()
+        self.canvas_widget.tile_cache.clear()
+        self.drawn_input = None
+        self.stats_label.text = f'Live: {live.scheme} on {live.address}, waiting for data'
+        self._live_event = Clock.schedule_interval(self._show_live_frame, 0)
+
+    def _switch_live(self, method):
+        """
+        Encodes the rest of the stream in `method`. The server keeps running,
+        so a connected capture tool goes on sending; the window starts over.
+        """
+        self.live.set_scheme(method, self.logic.stream_encoder(method))
+        self._highlight(method)
+        self.stats_label.text = f'Live: {method} on {self.live.address}, waiting for data'
+
+    def stop_live(self):
+        if self._live_event is not None:
+            self._live_event.cancel()
+            self._live_event = None
+        if self.live is not None:
+            self.live.stop()
+            self.live = None
+
+    def _live_failed(self, address, error):
+        Logger.error(f'EncodingVisualizer: live stream on {address} failed: {error}')
+        self.stop_live()
+        self.stats_label.text = f'Live stream on {address} failed: {error}'
+        self.stats_label.opacity = 1
+        self.live_toggle.state = 'normal'
+
+    def _show_live_frame(self, dt):
+        live = self.live
+        if live.error is not None:
+            self._live_failed(live.address, live.error)
+            return
+        frame = live.frames.take()
+        if frame is None:
+            return
+        profile = self.profiler.frame(f'{frame.scheme} (live)', bits=frame.position)
+        with profile.stage('draw') as record:
+            # The window moves every frame, so zoomed tiles would be stale
+            self.canvas_widget.reset_view()
+            self.canvas_widget.draw_waveform(frame.waveform, scheme=frame.scheme)
+            record['points'] = len(frame.waveform)
+        profile.finish()
+        if self.profiler.enabled:
+            self.profile_overlay.text = format_frame(self.profiler.last)
+        self.status.text = f'{frame.position:,} bits'
+        self.stats_label.text = (
+            f'Live: {frame.scheme} on {live.address}   {frame.position:,} bits received   '
+            f'{live.frames.published:,} frames, {live.frames.dropped:,} dropped'
+        )
+
+
+class EncodingAppKivy(App):
+    def build(self):
+        Window.size = (1000, 750)
+        return RootUI()
+
+    def on_stop(self):
+        self.root.stop_live()
+        self.root.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.logic.shutdown()
+
+
+if __name__ == '__main__':
+    EncodingAppKivy().run()
+
+
@@ -0,0 +1,220 @@
+"""
+Streaming statistics for comparing the line codes.
+
+`LineStats` consumes level arrays chunk by chunk, as
+`StreamEncoder.feed_levels()` produces them, and keeps only running totals,
+so a stream of any length is measured in one pass and bounded memory:
+- running digital sum (RDS): the integral of the signal in level x bit
+  intervals, with its extremes; their spread is the DC wander,
+- the longest run of identical levels, in bits,
+- transition density: level changes per bit,
+- B8ZS/HDB3 substitutions, counted from their bipolar violations,
+- a Welch power spectral density: Hann-windowed segments with 50% overlap,
+  averaged; frequencies are in multiples of the bit rate.
+
+`line_stats()` encodes an input with a scheme and returns its `LineStats`,
+`levels_stats()` measures levels that are already encoded;
+`format_stats()` / `format_stats_table()` render them for the viewers.
+"""
+import mmap
+
+import numpy as np
+
+from encoding_core import (
+    LineState, SAMPLES_PER_BIT, SCHEMES, StreamEncoder, to_bits
+)
+from packed_bits import DEFAULT_CHUNK_BITS, PackedBits
+
+# Welch segment length in bits: a resolution of 1/128 of the bit rate
+PSD_SEGMENT_BITS = 128
+# Longest slice of levels processed at once, so feeding one huge chunk
+# still only allocates a few block-sized temporaries
+BLOCK_SAMPLES = 1 << 20
+# Welch segments transformed at once, small enough to stay in cache
+WELCH_BLOCK_SEGMENTS = 256
+# Bipolar violations per substitution block: B8ZS 000VB0VB, HDB3 000V/B00V
+VIOLATIONS_PER_SUBSTITUTION = {'B8ZS': 2, 'HDB3': 1}
+# Upper edge of the band reported as low-frequency power, in bit rates
+LOW_FREQUENCY_BAND = 0.1
+
+
+class LineStats:
+    def __init__(self, scheme, segment_bits=PSD_SEGMENT_BITS):
+        self.scheme = scheme
+        self.samples_per_bit = SAMPLES_PER_BIT[scheme]
+        self.samples = 0
+        # Running digital sum in samples x level, and its extremes so far
+        self.rds = 0
+        self.rds_min = 0
+        self.rds_max = 0
+        self.transitions = 0
+        self.max_run = 0
+        self.run = 0
+        self.last = None
+        self.violations = 0
+        self.polarity = LineState().polarity
+        # Welch accumulator
+        self.segment = segment_bits * self.samples_per_bit
+        self.hop = self.segment // 2
+        # Periodic Hann window, as Welch averaging uses
+        self.window = np.hanning(self.segment + 1)[:-1]
+        self.power = np.zeros(self.segment // 2 + 1)
+        self.segments = 0
+        self.tail = np.zeros(0)
+
+    def feed_levels(self, levels):
+        levels = np.asarray(levels, dtype=np.int8)
+        for start in range(0, len(levels), BLOCK_SAMPLES):
+            self._feed_block(levels[start:start + BLOCK_SAMPLES])
+
+    def _feed_block(self, levels):
+        if not len(levels):
+            return
+        self.samples += len(levels)
+
+        rds = np.cumsum(levels, dtype=np.int64) + self.rds
+        self.rds_min = min(self.rds_min, int(rds.min()))
+        self.rds_max = max(self.rds_max, int(rds.max()))
+        self.rds = int(rds[-1])
+
+        # Runs of identical levels; the first one may continue the last
+        # run of the previous block
+        changes = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+        continues = levels[0] == self.last
+        self.transitions += len(changes) + (self.last is not None and not continues)
+        runs = np.diff(np.concatenate(([0], changes, [len(levels)])))
+        if continues:
+            runs[0] += self.run
+        self.max_run = max(self.max_run, int(runs.max()))
+        self.run = int(runs[-1])
+        self.last = int(levels[-1])
+
+        if self.scheme in VIOLATIONS_PER_SUBSTITUTION:
+            pulses = levels[levels != 0]
+            if len(pulses):
+                previous = np.concatenate(([self.polarity], pulses[:-1]))
+                self.violations += int(np.count_nonzero(pulses == previous))
+                self.polarity = int(pulses[-1])
+
+        self._welch(levels)
+
+    def _welch(self, levels):
+        buffer = np.concatenate((self.tail, levels))
+        if len(buffer) >= self.segment:
+            count = (len(buffer) - self.segment) // self.hop + 1
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self.segment)[::self.hop][:count]
+            for start in range(0, count, WELCH_BLOCK_SEGMENTS):
+                block = windows[start:start + WELCH_BLOCK_SEGMENTS] * self.window
+                # Real and imaginary parts side by side; |X|^2 summed over segments
+                spectrum = np.fft.rfft(block, axis=1).view(np.float64)
+                squares = np.einsum('ij,ij->j', spectrum, spectrum)
+                self.power += squares[0::2] + squares[1::2]
+            self.segments += count
+            buffer = buffer[count * self.hop:]
+        self.tail = buffer
+
+    @property
+    def bits(self):
+        return self.samples // self.samples_per_bit
+
+    @property
+    def substitutions(self):
+        """Substitution blocks sent, or None for schemes without them."""
+        per_block = VIOLATIONS_PER_SUBSTITUTION.get(self.scheme)
+        return None if per_block is None else self.violations // per_block
+
+    def psd(self):
+        """
+        `(frequencies, density)`: one-sided power spectral density over
+        frequencies in bit rates (0 up to samples_per_bit / 2). Before the
+        first full segment the held-back samples give a plain (unwindowed)
+        periodogram, zero-padded to the segment length.
+        """
+        power, segments = self.power, self.segments
+        if not segments and len(self.tail):
+            spectrum = np.fft.rfft(self.tail, n=self.segment)
+            power = np.abs(spectrum) ** 2
+            scale = 2.0 / (self.samples_per_bit * len(self.tail))
+        else:
+            scale = 2.0 / (self.samples_per_bit * (self.window ** 2).sum() * max(segments, 1))
+        density = power * scale
+        # DC (and Nyquist, for an even segment) appear once in the one-sided sum
+        density[0] /= 2
+        density[-1] /= 2
+        return np.fft.rfftfreq(self.segment, d=1.0 / self.samples_per_bit), density
+
+    def summary(self):
+        """The scalar statistics as a dict, RDS figures in level x bit intervals."""
+        spb = self.samples_per_bit
+        freqs, density = self.psd()
+        total = density.sum()
+        return {
+            'scheme': self.scheme,
+            'bits': self.bits,
+            'mean_level': self.rds / self.samples if self.samples else 0.0,
+            'rds': self.rds / spb,
+            'rds_min': self.rds_min / spb,
+            'rds_max': self.rds_max / spb,
+            'dc_wander': (self.rds_max - self.rds_min) / spb,
+            'max_run_bits': self.max_run / spb,
+            'transition_density': self.transitions / self.bits if self.bits else 0.0,
+            'substitutions': self.substitutions,
+            'psd_peak': float(freqs[1:][np.argmax(density[1:])]) if total else 0.0,
+            'low_frequency_power': float(density[freqs <= LOW_FREQUENCY_BAND].sum() / total) if total else 0.0,
+        }
+
+
+def line_stats(scheme, data, chunk_bits=DEFAULT_CHUNK_BITS):
+    """
+    Stream-encodes `data` (any input `to_bits()` accepts, an iterable of bit
+    chunks, or a `PackedBits`) and returns its `LineStats`.
+    """
+    if isinstance(data, PackedBits):
+        chunks = data.chunks(chunk_bits)
+    elif isinstance(data, (str, bytes, bytearray, memoryview, mmap.mmap, np.ndarray)):
+        bits = to_bits(data)
+        chunks = (bits[start:start + chunk_bits] for start in range(0, len(bits), chunk_bits))
+    else:
+        chunks = data
+    stats = LineStats(scheme)
+    encoder = StreamEncoder(scheme)
+    for chunk in chunks:
+        stats.feed_levels(encoder.feed_levels(chunk))
+    stats.feed_levels(encoder.flush_levels())
+    return stats
+
+
+def levels_stats(scheme, levels):
+    """`LineStats` of a whole, already encoded level array."""
+    stats = LineStats(scheme)
+    stats.feed_levels(levels)
+    return stats
+
+
+def format_stats(summary):
+    """Multi-line text panel for one scheme's `summary()`."""
+    lines = [
+        f"Mean level {summary['mean_level']:+.3f}   RDS {summary['rds']:+g} "
+        f"[{summary['rds_min']:+g}, {summary['rds_max']:+g}]   DC wander {summary['dc_wander']:g}",
+        f"Longest run {summary['max_run_bits']:g} bits   Transitions {summary['transition_density']:.3f}/bit",
+        f"PSD peak {summary['psd_peak']:.3f} x bit rate   "
+        f"Power below {LOW_FREQUENCY_BAND:g} x bit rate {summary['low_frequency_power']:.1%}",
+    ]
+    if summary['substitutions'] is not None:
+        lines[1] += f"   Substitutions {summary['substitutions']:,}"
+    return '\n'.join(lines)
+
+
+def format_stats_table(summaries):
+    """Fixed-width table with one row per scheme, for the all-schemes view."""
+    rows = [f"{'Scheme':<24}{'Mean':>7}{'Wander':>9}{'Run':>7}{'Trans/bit':>10}{'Subst':>7}{'LF power':>9}"]
+    for scheme in SCHEMES:
+        if scheme not in summaries:
+            continue
+        s = summaries[scheme]
+        substitutions = '-' if s['substitutions'] is None else f"{s['substitutions']:,}"
+        rows.append(
+            f"{scheme:<24}{s['mean_level']:>+7.2f}{s['dc_wander']:>9g}{s['max_run_bits']:>7g}"
+            f"{s['transition_density']:>10.3f}{substitutions:>7}{s['low_frequency_power']:>9.1%}"
+        )
+    return '\n'.join(rows)
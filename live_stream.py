@@ -0,0 +1,358 @@
+"""
+Live bitstream ingestion for a scrolling waveform view.
+
+`LiveStream` listens on a local socket, `tcp://host:port` or `unix:/path`,
+for a capture tool writing packed bits (MSB first). Everything it receives
+goes through one `StreamEncoder` for the whole session, so the line state
+(the pulse polarity included) carries across chunks and reconnections, and
+the levels of the last `window_bits` bits are kept as the visible window.
+`set_scheme()` switches a running stream to another scheme without closing
+the socket or its connections; the window starts over in the new scheme.
+
+It is one bitstream, so one sender is read at a time. A sender connecting
+while another is sending waits, with its data unread, until the first one
+disconnects. Interleaving the chunks of both would corrupt the line state.
+
+Backpressure keeps memory and UI latency bounded:
+- received chunks pass through a bounded asyncio queue. When the encoder
+  falls behind, the reader stops reading and TCP flow control slows the
+  sender down. Input is never dropped, which would corrupt the line state.
+- windows are published to a one-slot `LatestFrame` at most `fps` times a
+  second. A window the viewer has not taken yet is replaced by the newer
+  one and counted as dropped, so the viewer always draws the newest data
+  and never works through a backlog.
+
+The service runs its own event loop on a background thread (`start()`), so
+the viewer's main loop only polls `frames.take()`, and `error` once `ready`
+is set. Any failure, binding the socket or encoding, ends the service and
+is kept in `error`.
+
+    python live_stream.py listen tcp://127.0.0.1:5555 -s AMI
+    python live_stream.py generate tcp://127.0.0.1:5555 --rate 1e6
+
+`generate` is a stand-in capture tool writing random packed bits at a fixed
+bit rate; `listen` prints what a viewer would receive, once a second.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, START_LEVELS, StreamEncoder
+from waveform import Waveform
+
+DEFAULT_ADDRESS = 'tcp://127.0.0.1:5555'
+READ_BYTES = 1 << 14
+# Received chunks waiting for the encoder, at most
+INGEST_QUEUE_CHUNKS = 8
+WINDOW_BITS = 2048
+LIVE_FPS = 30
+# Write interval of the stand-in generator
+GENERATOR_TICK = 0.01
+
+
+def parse_address(address):
+    """`('tcp', (host, port))` or `('unix', path)` for a live-stream address."""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if address.startswith('tcp://'):
+        host, _, port = address[len('tcp://'):].rpartition(':')
+        if port.isdigit():
+            return 'tcp', (host or '127.0.0.1', int(port))
+    raise ValueError(f"expected tcp://host:port or unix:/path, got {address!r}")
+
+
+class LiveFrame:
+    """
+    One published window.
+    - waveform: the last window of the stream, timed from the window start.
+    - position: bits encoded so far (the stream time of the window's end).
+    - scheme: the scheme the window is encoded in.
+    """
+    __slots__ = ('waveform', 'position', 'scheme')
+
+    def __init__(self, waveform, position, scheme):
+        self.waveform = waveform
+        self.position = position
+        self.scheme = scheme
+
+
+class LatestFrame:
+    """Thread-safe one-slot mailbox: publishing over an untaken frame drops it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, frame):
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self.published += 1
+
+    def take(self):
+        """The newest frame not taken yet, or None."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+
+class LiveStream:
+    def __init__(self, scheme, address=DEFAULT_ADDRESS, window_bits=WINDOW_BITS, fps=LIVE_FPS, encoder=None):
+        """
+        - encoder: the `StreamEncoder` to continue, e.g. from
+          `EncodingLogic.stream_encoder()`; a fresh one by default.
+        """
+        self.address = address
+        # Raises ValueError here, on the caller's thread, for a bad address
+        self.kind, self.where = parse_address(address)
+        self.window_bits = window_bits
+        self.frame_interval = 1.0 / fps
+        self.frames = LatestFrame()
+        self.received_bytes = 0
+        self._use(scheme, StreamEncoder(scheme) if encoder is None else encoder)
+        # Set once the socket is listening, or `error` is set
+        self.ready = threading.Event()
+        self.error = None
+        self._thread = None
+        self._loop = None
+        self._stop = None
+
+    def feed(self, data):
+        """Encodes a chunk of packed bits into the window."""
+        levels = self.encoder.feed_levels(data)
+        self.received_bytes += len(data)
+        keep = self.window_bits * self.samples_per_bit
+        window = np.concatenate((self.window, levels)) if len(levels) <= keep else levels
+        if len(window) > keep:
+            self.start_level = int(window[-keep - 1])
+            window = window[-keep:]
+        self.window = window
+        self._unpublished = True
+
+    def publish(self):
+        waveform = Waveform.from_levels(self.window, self.samples_per_bit, self.start_level)
+        self.frames.publish(LiveFrame(waveform, self.encoder.position, self.scheme))
+        self._unpublished = False
+
+    def set_scheme(self, scheme, encoder=None):
+        """
+        Encodes the rest of the stream in `scheme`; callable from any thread.
+        The server and its connections stay up, and no received bit is lost:
+        bits the old encoder still held back go to the new one.
+        - encoder: the `StreamEncoder` to continue, as for the constructor.
+        """
+        encoder = StreamEncoder(scheme) if encoder is None else encoder
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                # On the loop's thread, between two chunks
+                loop.call_soon_threadsafe(self._switch, scheme, encoder)
+                return
+            except RuntimeError:
+                pass
+        self._switch(scheme, encoder)
+
+    def _switch(self, scheme, encoder):
+        previous = self.encoder
+        encoder.state.pending_zeros += previous.state.pending_zeros
+        previous.state.pending_zeros = 0
+        encoder.position = previous.position
+        self._use(scheme, encoder)
+
+    def _use(self, scheme, encoder):
+        self.scheme = scheme
+        self.samples_per_bit = SAMPLES_PER_BIT[scheme]
+        self.encoder = encoder
+        # Levels of the last `window_bits` bits, and the level before them
+        self.window = np.zeros(0, dtype=np.int8)
+        self.start_level = START_LEVELS[scheme]
+        self._unpublished = False
+
+    def start(self, timeout=5.0):
+        """
+        Serves on a background thread; returns once listening (check `error`),
+        or at once for `timeout=0`, leaving the caller to poll `ready`.
+        """
+        self._thread = threading.Thread(target=self._run, name='live-stream', daemon=True)
+        self._thread.start()
+        if timeout and not self.ready.wait(timeout) and self.error is None:
+            self.error = TimeoutError(f"not listening on {self.address} after {timeout:g} s")
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stops serving; a no-op once the service has ended."""
+        loop = self._loop
+        if loop is not None and self._stop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                # The loop closed in the meantime
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    async def serve(self):
+        """Accepts connections and encodes what they send until `stop()`."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        queue = asyncio.Queue(maxsize=INGEST_QUEUE_CHUNKS)
+        kind, where = self.kind, self.where
+        # Held by the connection being read; later senders wait their turn
+        sender = asyncio.Lock()
+
+        async def handle(reader, writer):
+            try:
+                async with sender:
+                    while True:
+                        data = await reader.read(READ_BYTES)
+                        if not data:
+                            break
+                        # Waits while the queue is full: backpressure to the sender
+                        await queue.put(data)
+            except (ConnectionError, asyncio.CancelledError):
+                # A dropped sender, or `stop()` with the sender still connected
+                pass
+            finally:
+                writer.close()
+
+        if kind == 'unix':
+            server = await asyncio.start_unix_server(handle, where)
+        else:
+            server = await asyncio.start_server(handle, *where)
+        self.ready.set()
+        encoding = asyncio.create_task(self._encode(queue))
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            encoding.cancel()
+            if kind == 'unix' and os.path.exists(where):
+                os.unlink(where)
+
+    async def _encode(self, queue):
+        try:
+            await self._encode_chunks(queue)
+        except Exception as e:
+            # Left running, the readers would block on the full queue forever
+            self.error = e
+            self._stop.set()
+
+    async def _encode_chunks(self, queue):
+        last_publish = 0.0
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), self.frame_interval)
+            except asyncio.TimeoutError:
+                data = None
+            if data is not None:
+                self.feed(data)
+            now = time.monotonic()
+            # Also publish the tail of a burst once the input goes quiet
+            if self._unpublished and (data is None or now - last_publish >= self.frame_interval):
+                self.publish()
+                last_publish = now
+
+
+async def generate(address, bit_rate, seconds=None, seed=0):
+    """
+    Stand-in capture tool: connects to `address` and writes random packed
+    bits at `bit_rate` bits per second. `drain()` honours the receiver's
+    backpressure. Returns the number of bytes written.
+    """
+    kind, where = parse_address(address)
+    if kind == 'unix':
+        reader, writer = await asyncio.open_unix_connection(where)
+    else:
+        reader, writer = await asyncio.open_connection(*where)
+    rng = np.random.default_rng(seed)
+    started = time.monotonic()
+    sent = 0.0
+    written = 0
+    try:
+        while seconds is None or time.monotonic() - started < seconds:
+            # Catch up with the wall clock, however late this tick is
+            due = bit_rate * (time.monotonic() - started) / 8 - sent
+            count = int(due)
+            if count:
+                writer.write(rng.integers(0, 256, count, dtype=np.uint8).tobytes())
+                await writer.drain()
+                sent += count
+                written += count
+            await asyncio.sleep(GENERATOR_TICK)
+    finally:
+        writer.close()
+    return written
+
+
+def _listen(args):
+    try:
+        stream = LiveStream(args.scheme, args.address, window_bits=args.window_bits).start()
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if stream.error:
+        print(f"error: {stream.error}", file=sys.stderr)
+        return 1
+    print(f"listening on {args.address} ({args.scheme})")
+    try:
+        while True:
+            time.sleep(1.0)
+            frame = stream.frames.take()
+            if frame is not None:
+                print(f"{frame.position:,} bits, window of {len(frame.waveform):,} edges, "
+                      f"{stream.frames.published:,} frames, {stream.frames.dropped:,} dropped")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+    listen = commands.add_parser('listen', help="receive and encode a stream, printing frame statistics")
+    listen.add_argument('address', nargs='?', default=DEFAULT_ADDRESS)
+    listen.add_argument('-s', '--scheme', choices=SCHEMES, default='AMI')
+    listen.add_argument('--window-bits', type=int, default=WINDOW_BITS)
+    gen = commands.add_parser('generate', help="send random packed bits at a fixed rate")
+    gen.add_argument('address', nargs='?', default=DEFAULT_ADDRESS)
+    gen.add_argument('--rate', type=float, default=1e6, help="bits per second (default: 10^6)")
+    gen.add_argument('--seconds', type=float, help="stop after this long (default: never)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'listen':
+        return _listen(args)
+    try:
+        written = asyncio.run(generate(args.address, args.rate, args.seconds))
+    except KeyboardInterrupt:
+        return 0
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"sent {written * 8:,} bits")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
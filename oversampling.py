@@ -0,0 +1,99 @@
+"""
+Uniformly sampled signals at N samples per bit, for channel simulation.
+
+`UniformSignal` presents an encoded level array as N samples per bit
+without copying it: `grid` is a (levels, N / SAMPLES_PER_BIT) broadcast view
+with a zero stride, so 10^7 bits at 64 samples per bit still only hold the
+10-20 MB level array. Samples are materialized only on request:
+- `signal[a:b]` copies just that range,
+- `chunks()` yields contiguous blocks of at most `max_samples` samples,
+- `to_array()` copies everything, refusing when the result would exceed
+  the memory budget; `memory_estimate()` tells the size up front.
+"""
+import numpy as np
+
+from encoding_core import SAMPLES_PER_BIT, encode_levels
+
+MAX_SAMPLES_PER_BIT = 64
+# Largest array to_array() builds unless told otherwise
+DEFAULT_BUDGET_BYTES = 256 << 20
+# Samples per block yielded by chunks(): 16 MB of float64
+CHUNK_SAMPLES = 1 << 21
+
+
+def memory_estimate(nbits, samples_per_bit, dtype=np.int8):
+    """Bytes needed to materialize `nbits` bits at `samples_per_bit`."""
+    return nbits * samples_per_bit * np.dtype(dtype).itemsize
+
+
+class UniformSignal:
+    def __init__(self, levels, native_samples_per_bit, samples_per_bit):
+        """
+        - levels: encoded levels, `native_samples_per_bit` per bit.
+        - samples_per_bit: output rate; a multiple of the native rate, at
+          most MAX_SAMPLES_PER_BIT.
+        """
+        if not 1 <= samples_per_bit <= MAX_SAMPLES_PER_BIT or samples_per_bit % native_samples_per_bit:
+            raise ValueError(
+                f"samples_per_bit must be a multiple of {native_samples_per_bit} "
+                f"up to {MAX_SAMPLES_PER_BIT}, got {samples_per_bit}"
+            )
+        self.levels = np.asarray(levels)
+        self.samples_per_bit = samples_per_bit
+        self.repeat = samples_per_bit // native_samples_per_bit
+        self.nbits = len(self.levels) // native_samples_per_bit
+        # Zero-copy: row i is level i repeated, all rows share its memory
+        self.grid = np.broadcast_to(self.levels[:, None], (len(self.levels), self.repeat))
+
+    def __len__(self):
+        return len(self.levels) * self.repeat
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            count = len(range(start, stop, step))
+            if not count:
+                return self.levels[:0].copy()
+            if step < 0:
+                # The same samples read forwards, then reversed
+                return self[start + step * (count - 1):start + 1:-step][::-1]
+            first = start // self.repeat
+            last = -(-stop // self.repeat)
+            block = np.repeat(self.levels[first:last], self.repeat)
+            return block[start - first * self.repeat:stop - first * self.repeat:step]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('sample index out of range')
+        return self.levels[index // self.repeat]
+
+    def times(self, start=0, stop=None):
+        """Sample times in bit intervals for samples [start, stop)."""
+        stop = len(self) if stop is None else stop
+        return np.arange(start, stop) / self.samples_per_bit
+
+    def chunks(self, max_samples=CHUNK_SAMPLES, dtype=None):
+        """
+        Yields the samples as contiguous arrays of at most `max_samples`
+        (rounded down to whole levels), so peak memory is one block.
+        """
+        rows = max(1, max_samples // self.repeat)
+        for first in range(0, len(self.levels), rows):
+            block = self.grid[first:first + rows]
+            yield (block if dtype is None else block.astype(dtype)).reshape(-1)
+
+    def to_array(self, dtype=None, budget=DEFAULT_BUDGET_BYTES):
+        """All samples as one contiguous array, within `budget` bytes."""
+        dtype = self.levels.dtype if dtype is None else np.dtype(dtype)
+        needed = len(self) * dtype.itemsize
+        if budget is not None and needed > budget:
+            raise MemoryError(
+                f"{len(self):,} samples need {needed / 2**20:.0f} MiB, over the "
+                f"{budget / 2**20:.0f} MiB budget; use chunks() or a slice instead"
+            )
+        return self.grid.astype(dtype).reshape(-1)
+
+
+def oversample(scheme, data, samples_per_bit):
+    """Encodes `data` and returns it as a `UniformSignal` at `samples_per_bit`."""
+    return UniformSignal(encode_levels(scheme, data), SAMPLES_PER_BIT[scheme], samples_per_bit)
@@ -0,0 +1,66 @@
+"""
+Packed-bit input for the encoders.
+
+A `PackedBits` wraps raw bytes (eight bits per byte) without copying them:
+`bytes`, `bytearray`, `memoryview`, `mmap.mmap` objects and memory-mapped
+files all work. Bits are unpacked on demand, one slice or chunk at a time,
+so a multi-hundred-MB capture never has to exist as a '0'/'1' text string
+or as a fully unpacked array.
+"""
+import os
+
+import numpy as np
+
+# Bit order within each byte: 'msb' reads bit 7 first, 'lsb' reads bit 0 first.
+BIT_ORDERS = {'msb': 'big', 'lsb': 'little'}
+
+DEFAULT_CHUNK_BITS = 1 << 20
+
+
+class PackedBits:
+    def __init__(self, buffer, bit_order='msb', nbits=None):
+        """
+        - buffer: any object exposing the buffer protocol.
+        - bit_order: 'msb' or 'lsb'.
+        - nbits: number of valid bits, when the last byte is only partly used.
+        """
+        if bit_order not in BIT_ORDERS:
+            raise ValueError(f"bit_order must be one of {sorted(BIT_ORDERS)}, got {bit_order!r}")
+        # Zero-copy view over the caller's memory.
+        self.bytes = np.frombuffer(buffer, dtype=np.uint8)
+        self.bit_order = bit_order
+        total = 8 * len(self.bytes)
+        if nbits is None:
+            nbits = total
+        if not 0 <= nbits <= total:
+            raise ValueError(f"nbits must be between 0 and {total}, got {nbits}")
+        self.nbits = nbits
+
+    @classmethod
+    def from_file(cls, path, bit_order='msb', nbits=None):
+        """Memory-maps a capture file read-only; pages are loaded as they are read."""
+        if os.path.getsize(path) == 0:
+            # An empty file cannot be memory-mapped
+            return cls(b'', bit_order, nbits)
+        return cls(np.memmap(path, dtype=np.uint8, mode='r'), bit_order, nbits)
+
+    def __len__(self):
+        return self.nbits
+
+    def unpack(self, start=0, stop=None):
+        """Returns bits [start, stop) as a uint8 array of 0/1 values."""
+        start, stop, _ = slice(start, stop).indices(self.nbits)
+        if stop <= start:
+            return np.zeros(0, dtype=np.uint8)
+        first_byte = start // 8
+        last_byte = (stop + 7) // 8
+        bits = np.unpackbits(self.bytes[first_byte:last_byte],
+                             bitorder=BIT_ORDERS[self.bit_order])
+        skip = start - 8 * first_byte
+        return bits[skip:skip + stop - start]
+
+    def chunks(self, chunk_bits=DEFAULT_CHUNK_BITS, start=0, stop=None):
+        """Yields unpacked arrays of at most `chunk_bits` bits covering [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(self.nbits)
+        for position in range(start, stop, chunk_bits):
+            yield self.unpack(position, min(position + chunk_bits, stop))
@@ -0,0 +1,147 @@
+"""
+Encoding one input under several schemes at once on a process pool.
+
+`SchemePool.encode_all()` puts the packed input bits into a single
+`multiprocessing.shared_memory` block and hands the workers only its name,
+so no worker receives a pickled copy of the input; each one attaches to the
+block, unpacks and encodes the bits for its scheme and sends back the (much
+smaller) transition-only `Waveform`. Packed input (bytes, an mmap, a
+`PackedBits`) is copied into the block as it is, never unpacked in the
+parent. The schemes are independent, so wall time on large inputs
+drops with the number of cores up to one core per scheme.
+`SchemePool.stats_all()` measures the line statistics of finished waveforms
+side by side the same way.
+
+Workers are started with forkserver (spawn where that is missing), never
+by forking the viewer itself: the pool is started from an encode worker
+thread of a multi-threaded GL process, and forking one of those can
+deadlock in the child.
+
+Small inputs, machines with a single usable CPU (where workers only add
+process overhead), and platforms without working process pools (Android's
+Python has no `sem_open`) are encoded in-process instead, as is an input
+whose pool broke under it (a worker killed, e.g. by the OOM killer).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import mmap
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, encode_waveform, to_bits
+from line_stats import levels_stats
+from packed_bits import PackedBits
+
+# Below this many bits a process round trip costs more than it saves.
+PARALLEL_MIN_BITS = 1 << 18
+
+
+def available_cpus():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _encode_shared(name, nbits, bit_order, scheme):
+    """Worker: encodes the packed input in shared memory block `name`."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return encode_waveform(scheme, PackedBits(block.buf, bit_order, nbits))
+    finally:
+        block.close()
+
+
+def _waveform_stats(scheme, waveform):
+    """Worker: the line statistics summary of an encoded waveform."""
+    return levels_stats(scheme, waveform.to_levels(SAMPLES_PER_BIT[scheme])).summary()
+
+
+class SchemePool:
+    def __init__(self, workers=None, min_bits=PARALLEL_MIN_BITS):
+        """
+        - workers: pool size; defaults to one per scheme, capped at the
+          number of CPUs.
+        - min_bits: inputs shorter than this are encoded in-process.
+        """
+        self.workers = workers or max(1, min(len(SCHEMES), available_cpus()))
+        self.min_bits = min_bits
+        self._executor = None
+        # Set once a pool could not be started on this platform
+        self.unavailable = False
+
+    def encode_all(self, data, schemes=SCHEMES):
+        """Returns {scheme: Waveform} for `data` under each of `schemes`."""
+        if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+            data = PackedBits(data)
+        schemes = list(schemes)
+        nbits = len(data)
+        executor = self._executor_for(nbits, len(schemes))
+        if executor is None:
+            return self._encode_here(data, schemes)
+
+        if isinstance(data, PackedBits):
+            packed, bit_order = data.bytes[:-(-nbits // 8)], data.bit_order
+        else:
+            packed, bit_order = np.packbits(to_bits(data)), 'msb'
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(packed)))
+        try:
+            np.frombuffer(block.buf, dtype=np.uint8, count=len(packed))[:] = packed
+            results = self._run(executor, _encode_shared, {
+                scheme: (block.name, nbits, bit_order, scheme) for scheme in schemes
+            })
+        finally:
+            block.close()
+            block.unlink()
+        return self._encode_here(data, schemes) if results is None else results
+
+    def stats_all(self, waveforms):
+        """Returns {scheme: line statistics summary} for {scheme: Waveform}."""
+        bits = max((waveform.end for waveform in waveforms.values()), default=0)
+        executor = self._executor_for(bits, len(waveforms))
+        jobs = {scheme: (scheme, waveform) for scheme, waveform in waveforms.items()}
+        results = None if executor is None else self._run(executor, _waveform_stats, jobs)
+        if results is None:
+            results = {scheme: _waveform_stats(*args) for scheme, args in jobs.items()}
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run(self, executor, function, jobs):
+        """{scheme: function(*args)} for {scheme: args} on the pool, or None if it broke."""
+        try:
+            futures = {scheme: executor.submit(function, *args) for scheme, args in jobs.items()}
+            return {scheme: future.result() for scheme, future in futures.items()}
+        except BrokenProcessPool:
+            # Not tried again: a pool that lost a worker once will likely again
+            self.shutdown()
+            self.unavailable = True
+            return None
+
+    def _encode_here(self, data, schemes):
+        # Unpacked once for all the schemes
+        bits = to_bits(data)
+        return {scheme: encode_waveform(scheme, bits) for scheme in schemes}
+
+    def _executor_for(self, nbits, jobs):
+        """The pool, if running `jobs` jobs over `nbits` bits on it pays off; else None."""
+        if nbits < self.min_bits or jobs < 2 or self.workers < 2 or available_cpus() < 2:
+            return None
+        return self._get_executor()
+
+    def _get_executor(self):
+        if self._executor is None and not self.unavailable:
+            try:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            except (ImportError, NotImplementedError, OSError):
+                self.unavailable = True
+        return self._executor
@@ -0,0 +1,165 @@
+"""
+Per-stage timing of the viewers' redraw pipeline.
+
+A redraw is one `Frame`: the viewer opens it when a scheme is selected (or
+the input changes) and wraps each stage in `frame.stage(name)`:
+- validate: the '0'/'1' check of the input,
+- encode: the cached / incremental / pooled encode,
+- stats: the line statistics for the panel, timed as a frame of its own
+  once the input has been left alone for a moment,
+- layout: pixel mapping (`prepare_fitted()` / `band_vertices()`),
+- draw: handing the geometry to Kivy or Matplotlib.
+Each stage records its wall time, the number of points it produced (set by
+the caller on the yielded record) and, while allocation tracking is on, the
+peak memory traced by `tracemalloc` above the stage's starting level. A
+Kivy frame starts on the UI thread, encodes on the worker thread and ends on
+the UI thread again. The stages of one frame run one after another, but
+different frames' stages can overlap: the worker may encode the next input
+while the UI thread draws the last one, or a live-stream frame draws during
+an encode. `tracemalloc` is process-wide, so only one stage at a time
+measures allocations. A stage that starts while another is measuring gets
+no `alloc_bytes`, and both are marked `overlapped`, since the measuring
+stage's peak may include the other thread's allocations.
+
+While a `StageProfiler` is disabled `frame()` returns `NULL_FRAME`, whose
+stages cost one context manager each. Finished frames are kept for the
+overlay and, when a log path is set, appended to a JSON-lines file, one
+object per frame. Setting ENCODER_PROFILE_LOG to a path turns profiling on
+at start-up with that log, for collecting numbers from devices in the field.
+"""
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILE_LOG_ENV = 'ENCODER_PROFILE_LOG'
+
+
+class _AllocationSlot:
+    """The one stage at a time measuring allocations, across threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Set when a stage started while the holder was measuring
+        self.contended = False
+
+
+_allocations = _AllocationSlot()
+
+
+class Frame:
+    def __init__(self, profiler, label, **info):
+        self.profiler = profiler
+        self.label = label
+        # Extra fields for the log, e.g. the input length
+        self.info = info
+        self.stages = []
+        self.started = time.perf_counter()
+        self.total_ms = None
+
+    @contextmanager
+    def stage(self, name, points=None):
+        """Times the enclosed block; yields its record for the caller to add `points`."""
+        record = {'stage': name, 'ms': 0.0, 'points': points, 'alloc_bytes': None, 'overlapped': False}
+        tracing = tracemalloc.is_tracing()
+        measuring = tracing and _allocations.lock.acquire(blocking=False)
+        if measuring:
+            _allocations.contended = False
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        elif tracing:
+            record['overlapped'] = _allocations.contended = True
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - started) * 1e3
+            if measuring:
+                record['alloc_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - base)
+                record['overlapped'] = _allocations.contended
+                _allocations.lock.release()
+            self.stages.append(record)
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1e3
+        self.profiler.finished(self)
+
+    def to_dict(self):
+        return {
+            'time': time.time(), 'viewer': self.profiler.viewer, 'label': self.label,
+            **self.info, 'total_ms': self.total_ms, 'stages': self.stages,
+        }
+
+
+class _NullFrame:
+    """Stands in for a Frame while profiling is off."""
+
+    def stage(self, name, points=None):
+        return nullcontext({})
+
+    def finish(self):
+        pass
+
+
+NULL_FRAME = _NullFrame()
+
+
+class StageProfiler:
+    def __init__(self, viewer, log_path=None, track_allocations=True):
+        """
+        - viewer: name written to the log ('kivy' or 'tk').
+        - log_path: JSON-lines file each finished frame is appended to.
+        - track_allocations: run tracemalloc while enabled. It slows
+          allocation-heavy Python code down, which shows in the timings.
+        """
+        self.viewer = viewer
+        self.log_path = log_path
+        self.track_allocations = track_allocations
+        self.enabled = False
+        self.last = None
+        self._started_tracing = False
+
+    @classmethod
+    def from_environment(cls, viewer):
+        """A profiler logging to $ENCODER_PROFILE_LOG, already enabled if that is set."""
+        profiler = cls(viewer, log_path=os.environ.get(PROFILE_LOG_ENV) or None)
+        if profiler.log_path:
+            profiler.set_enabled(True)
+        return profiler
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled and self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif not enabled and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def frame(self, label, **info):
+        return Frame(self, label, **info) if self.enabled else NULL_FRAME
+
+    def finished(self, frame):
+        self.last = frame
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(frame.to_dict()) + '\n')
+
+
+def format_frame(frame):
+    """Overlay text: the frame total, then one line per stage."""
+    if frame is None:
+        return 'Profiling: waiting for a redraw'
+    lines = [f"{frame.label}: {frame.total_ms:.2f} ms"]
+    for record in frame.stages:
+        line = f"{record['stage']:<9}{record['ms']:8.2f} ms"
+        if record['points'] is not None:
+            line += f"  {record['points']:,} pts"
+        if record['alloc_bytes'] is not None:
+            line += f"  {record['alloc_bytes'] / 2**20:.2f} MiB"
+        if record['overlapped']:
+            line += "  (overlapped)"
+        lines.append(line)
+    return '\n'.join(lines)
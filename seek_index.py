@@ -0,0 +1,204 @@
+"""
+Seekable random-access encoding of large capture files.
+
+The stateful schemes (NRZ-I, Differential Manchester, AMI, B8ZS, HDB3) need
+the line state at bit k before they can encode anything from there.
+`build_index()` records that state every `interval` bits in a single streaming
+pass, and `open_capture()` keeps it in a side-car file next to the capture so
+the pass only ever runs once. Where the capture's directory is not writable,
+the side-car goes to the user cache directory instead, and failing that the
+index is only kept in memory. A `SeekableCapture` then encodes any window
+[k, k + w) by resuming from the checkpoint before k, reading at most
+`interval + w + 8` bits: O(w) for a fixed interval, whatever the file size.
+`EncodingLogic.open_capture()` / `get_window()` expose it to the viewers.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from encoding_core import (
+    LineState, SAMPLES_PER_BIT, SIGNED_STATE, START_LEVELS, SUBSTITUTION_SIZES,
+    StreamEncoder
+)
+from packed_bits import PackedBits
+from waveform import Waveform
+
+DEFAULT_INTERVAL = 1 << 16
+INDEX_SUFFIX = '.lcidx.npz'
+# Side-car directory for captures in read-only directories, under the user
+# cache directory ($XDG_CACHE_HOME or ~/.cache)
+CACHE_SUBDIR = 'encodingvisualizer'
+
+# Only these schemes carry state; the others encode any window directly.
+STATEFUL_SCHEMES = tuple(SIGNED_STATE)
+
+_STATE_FIELDS = ('level', 'polarity', 'ones_parity', 'pending_zeros')
+
+
+class CaptureIndex:
+    """
+    Encoder state checkpoints for one capture.
+    - states[scheme][j] is the LineState after min(j * interval, nbits) bits,
+      stored as one int64 row per checkpoint in `_STATE_FIELDS` order.
+    - source_size / source_mtime_ns identify the capture file it was built for.
+    """
+
+    def __init__(self, interval, nbits, bit_order, states, source_size=None, source_mtime_ns=None):
+        self.interval = interval
+        self.nbits = nbits
+        self.bit_order = bit_order
+        self.states = states
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+
+    def state_at(self, scheme, checkpoint):
+        """Returns `(position, LineState)` for checkpoint number `checkpoint`."""
+        state = LineState()
+        for field, value in zip(_STATE_FIELDS, self.states[scheme][checkpoint]):
+            setattr(state, field, int(value))
+        return min(checkpoint * self.interval, self.nbits), state
+
+    def save(self, path):
+        arrays = {f'state:{scheme}': rows for scheme, rows in self.states.items()}
+        np.savez(
+            path, interval=self.interval, nbits=self.nbits, bit_order=self.bit_order,
+            source_size=-1 if self.source_size is None else self.source_size,
+            source_mtime_ns=-1 if self.source_mtime_ns is None else self.source_mtime_ns,
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            states = {key.split(':', 1)[1]: data[key] for key in data.files if key.startswith('state:')}
+            source_size = int(data['source_size'])
+            source_mtime_ns = int(data['source_mtime_ns'])
+            return cls(
+                int(data['interval']), int(data['nbits']), str(data['bit_order']), states,
+                None if source_size < 0 else source_size,
+                None if source_mtime_ns < 0 else source_mtime_ns,
+            )
+
+
+def build_index(bits, interval=DEFAULT_INTERVAL, schemes=STATEFUL_SCHEMES):
+    """
+    Streams once through `bits` (a `PackedBits`), encoding every stateful
+    scheme and recording its state every `interval` bits.
+    """
+    schemes = [scheme for scheme in schemes if scheme in SIGNED_STATE]
+    checkpoints = -(-len(bits) // interval) + 1
+    states = {scheme: np.empty((checkpoints, len(_STATE_FIELDS)), dtype=np.int64) for scheme in schemes}
+    encoders = {scheme: StreamEncoder(scheme) for scheme in schemes}
+
+    def record(row):
+        for scheme, encoder in encoders.items():
+            states[scheme][row] = [getattr(encoder.state, field) for field in _STATE_FIELDS]
+
+    record(0)
+    for row, chunk in enumerate(bits.chunks(interval), start=1):
+        for encoder in encoders.values():
+            encoder.feed_levels(chunk)
+        record(row)
+    return CaptureIndex(interval, len(bits), bits.bit_order, states)
+
+
+class SeekableCapture:
+    def __init__(self, bits, index):
+        """
+        - bits: the capture as a `PackedBits`.
+        - index: its `CaptureIndex`.
+        """
+        self.bits = bits
+        self.index = index
+
+    def __len__(self):
+        return len(self.bits)
+
+    def window_levels(self, scheme, start, width):
+        """
+        Level array for bits [start, start + width), plus the level just
+        before the window.
+        """
+        nbits = len(self.bits)
+        start = min(max(0, start), nbits)
+        stop = min(start + max(0, width), nbits)
+        # Resume strictly before `start` so the preceding level is known.
+        if scheme in self.index.states:
+            position, state = self.index.state_at(scheme, max(0, start - 1) // self.index.interval)
+        else:
+            position, state = max(0, start - 1), LineState()
+        encoder = StreamEncoder(scheme, state)
+        first_emitted = encoder.position = position - state.pending_zeros
+
+        pieces = [encoder.feed_levels(self.bits.unpack(position, stop))]
+        read = stop
+        # Zeros at the end of the window may still be part of a substitution
+        # block; read on until every bit in the window has been emitted.
+        while encoder.position < stop:
+            if read >= nbits:
+                pieces.append(encoder.flush_levels())
+                break
+            ahead = min(nbits, read + SUBSTITUTION_SIZES.get(scheme, 1))
+            pieces.append(encoder.feed_levels(self.bits.unpack(read, ahead)))
+            read = ahead
+
+        spb = SAMPLES_PER_BIT[scheme]
+        levels = np.concatenate(pieces)
+        skip = (start - first_emitted) * spb
+        before = int(levels[skip - 1]) if skip else START_LEVELS[scheme]
+        return levels[skip:skip + (stop - start) * spb], before
+
+    def window(self, scheme, start, width):
+        """Waveform of bits [start, start + width), timed from bit 0 of the capture."""
+        levels, before = self.window_levels(scheme, start, width)
+        start = min(max(0, start), len(self.bits))
+        return Waveform.from_levels(levels, SAMPLES_PER_BIT[scheme], before, offset=start)
+
+
+def index_paths(path):
+    """
+    Where the side-car index of capture `path` may be kept, in order of
+    preference: next to the capture, then in the user cache directory.
+    """
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    key = hashlib.sha1(os.path.realpath(path).encode()).hexdigest()
+    return [path + INDEX_SUFFIX, os.path.join(cache, CACHE_SUBDIR, key + INDEX_SUFFIX)]
+
+
+def open_capture(path, bit_order='msb', nbits=None, interval=DEFAULT_INTERVAL, schemes=STATEFUL_SCHEMES):
+    """
+    Memory-maps a packed capture file and returns a `SeekableCapture`. A
+    side-car index (see `index_paths()`) is reused when it matches the file
+    and the options, and (re)built in one streaming pass otherwise.
+    """
+    bits = PackedBits.from_file(path, bit_order, nbits)
+    stat = os.stat(path)
+
+    def matches(index):
+        return (
+            index.interval == interval and index.nbits == len(bits) and index.bit_order == bit_order
+            and index.source_size == stat.st_size and index.source_mtime_ns == stat.st_mtime_ns
+            and all(scheme in index.states for scheme in schemes if scheme in SIGNED_STATE)
+        )
+
+    paths = index_paths(path)
+    for index_path in paths:
+        try:
+            index = CaptureIndex.load(index_path)
+        except (OSError, ValueError, KeyError):
+            continue
+        if matches(index):
+            return SeekableCapture(bits, index)
+
+    index = build_index(bits, interval, schemes)
+    index.source_size, index.source_mtime_ns = stat.st_size, stat.st_mtime_ns
+    for index_path in paths:
+        try:
+            os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+            index.save(index_path)
+            break
+        except OSError:
+            # Not writable: try the next place, or keep the index in memory
+            continue
+    return SeekableCapture(bits, index)
@@ -0,0 +1,186 @@
+"""
+Reference oracle: the original per-bit list implementations of the nine
+line codes, as the viewers shipped them before the vectorized engine. Kept
+verbatim so every engine can be checked against them.
+"""
+import random
+
+
+class ReferenceLogic:
+    def __init__(self):
+        self.last_pulse_polarity = -1
+
+    def reset(self):
+        self.last_pulse_polarity = -1
+
+    def get_unipolar(self, data):
+        x, y = [0], [0]
+        for i, bit in enumerate(data):
+            level = 1 if bit == '1' else 0
+            x.extend([i, i + 1])
+            y.extend([level, level])
+        return x, y
+
+    def get_nrz_l(self, data):
+        x, y = [0], [1]
+        for i, bit in enumerate(data):
+            level = -1 if bit == '1' else 1
+            x.extend([i, i + 1])
+            y.extend([level, level])
+        return x, y
+
+    def get_nrz_i(self, data):
+        x, y = [0], [1]
+        current_level = 1
+        for i, bit in enumerate(data):
+            if bit == '1':
+                current_level *= -1
+            x.extend([i, i + 1])
+            y.extend([current_level, current_level])
+        return x, y
+
+    def get_rz(self, data):
+        x, y = [0], [0]
+        for i, bit in enumerate(data):
+            if bit == '0':
+                x.extend([i, i + 1])
+                y.extend([0, 0])
+            else:
+                x.extend([i, i + 0.5, i + 0.5, i + 1])
+                y.extend([1, 1, 0, 0])
+        return x, y
+
+    def get_manchester(self, data):
+        x, y = [0], [1]
+        for i, bit in enumerate(data):
+            if bit == '0':
+                x.extend([i, i + 0.5, i + 0.5, i + 1])
+                y.extend([1, 1, -1, -1])
+            else:
+                x.extend([i, i + 0.5, i + 0.5, i + 1])
+                y.extend([-1, -1, 1, 1])
+        return x, y
+
+    def get_diff_manchester(self, data):
+        x, y = [0], [1]
+        current_level = 1
+        for i, bit in enumerate(data):
+            if bit == '0':
+                current_level *= -1
+            x.extend([i, i + 0.5, i + 0.5, i + 1])
+            y.extend([current_level, current_level, -current_level, -current_level])
+            current_level *= -1
+        return x, y
+
+    def get_ami(self, data, is_scrambled=False):
+        x, y = [0], [0]
+        symbols = data if is_scrambled else [(bit, 'normal') for bit in data]
+        for i, (symbol, typ) in enumerate(symbols):
+            if symbol == '0':
+                x.extend([i, i + 1])
+                y.extend([0, 0])
+            else:
+                if typ != 'violation':
+                    self.last_pulse_polarity *= -1
+                x.extend([i, i + 1])
+                y.extend([self.last_pulse_polarity, self.last_pulse_polarity])
+        return x, y
+
+    def get_b8zs(self, data):
+        scrambled_data = []
+        i = 0
+        while i < len(data):
+            if data[i:i+8] == '00000000':
+                v_polarity = self.last_pulse_polarity
+                b_polarity = -self.last_pulse_polarity
+                scrambled_data.extend([('0', 'normal'), ('0', 'normal'), ('0', 'normal')])
+                scrambled_data.append(('V', 'violation'))
+                scrambled_data.append(('B', 'bipolar'))
+                scrambled_data.extend([('0', 'normal')])
+                scrambled_data.append(('V', 'violation'))
+                scrambled_data.append(('B', 'bipolar'))
+                self.last_pulse_polarity = b_polarity
+                i += 8
+            else:
+                bit = data[i]
+                scrambled_data.append((bit, 'normal'))
+                if bit == '1':
+                    self.last_pulse_polarity *= -1
+                i += 1
+        self.last_pulse_polarity = -1
+        return self.get_ami(scrambled_data, is_scrambled=True)
+
+    def get_hdb3(self, data):
+        scrambled_data = []
+        i = 0
+        ones_since_last_sub = 0
+        while i < len(data):
+            if data[i:i+4] == '0000':
+                if ones_since_last_sub % 2 == 0:
+                    scrambled_data.append(('B', 'bipolar'))
+                    scrambled_data.extend([('0', 'normal'), ('0', 'normal')])
+                    scrambled_data.append(('V', 'violation'))
+                    self.last_pulse_polarity *= -1
+                else:
+                    scrambled_data.extend([('0', 'normal'), ('0', 'normal'), ('0', 'normal')])
+                    scrambled_data.append(('V', 'violation'))
+                ones_since_last_sub = 0
+                i += 4
+            else:
+                bit = data[i]
+                scrambled_data.append((bit, 'normal'))
+                if bit == '1':
+                    ones_since_last_sub += 1
+                    self.last_pulse_polarity *= -1
+                i += 1
+        self.last_pulse_polarity = -1
+        return self.get_ami(scrambled_data, is_scrambled=True)
+
+
+METHODS = {
+    'Unipolar': 'get_unipolar', 'NRZ-L': 'get_nrz_l', 'NRZ-I': 'get_nrz_i', 'RZ': 'get_rz',
+    'Manchester': 'get_manchester', 'Differential Manchester': 'get_diff_manchester',
+    'AMI': 'get_ami', 'B8ZS': 'get_b8zs', 'HDB3': 'get_hdb3',
+}
+
+# Zero runs around the substitution sizes of HDB3 (4) and B8ZS (8)
+ZERO_RUNS = (3, 4, 7, 8, 16)
+
+
+def reference_points(scheme, data):
+    """`(x, y)` of the reference implementation, from a fresh polarity."""
+    return getattr(ReferenceLogic(), METHODS[scheme])(data)
+
+
+def reference_levels(scheme, data, samples_per_bit):
+    """
+    The reference waveform as a level array, `samples_per_bit` per bit:
+    after the leading point every breakpoint pair is one flat segment.
+    """
+    x, y = reference_points(scheme, data)
+    levels = []
+    for start, stop, level in zip(x[1::2], x[2::2], y[1::2]):
+        levels.extend([level] * round((stop - start) * samples_per_bit))
+    return levels
+
+
+def random_bits(rng, n, p_one=0.5):
+    return ''.join('1' if rng.random() < p_one else '0' for _ in range(n))
+
+
+def edge_cases():
+    """Empty input, single bits, and zero runs alone, between ones and at the ends."""
+    cases = ['', '0', '1', '11', '0100000000110']
+    for run in ZERO_RUNS:
+        zeros = '0' * run
+        cases += [zeros, '1' + zeros, zeros + '1', '1' + zeros + '1', '11' + zeros + '1' + zeros + '011']
+    return cases
+
+
+def sample_inputs(count=60, seed=0):
+    """Edge cases followed by random inputs, sparse ones giving long zero runs."""
+    rng = random.Random(seed)
+    cases = edge_cases()
+    for _ in range(count):
+        cases.append(random_bits(rng, rng.randint(1, 300), rng.choice((0.05, 0.2, 0.5, 0.9))))
+    return cases
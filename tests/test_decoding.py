@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+import pytest
+
+from decoding import decode
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, START_LEVELS, to_bits
+from reference import random_bits, reference_levels, sample_inputs
+from waveform import Waveform
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_decodes_reference_waveforms(scheme):
+    spb = SAMPLES_PER_BIT[scheme]
+    for data in sample_inputs(seed=6):
+        levels = np.array(reference_levels(scheme, data, spb), dtype=np.int8)
+        for signal in (levels, Waveform.from_levels(levels, spb, START_LEVELS[scheme])):
+            decoded = decode(scheme, signal)
+            assert np.array_equal(decoded.bits, to_bits(data)), data
+            assert decoded.first_error() is None, data
+
+
+@pytest.mark.parametrize('scheme', ('AMI', 'B8ZS', 'HDB3'))
+def test_flags_bipolar_violation(scheme):
+    # Two pulses of the same polarity with no substitution block around them
+    levels = np.array([1, 0, 1, 0, -1], dtype=np.int8)
+    decoded = decode(scheme, levels)
+    assert list(decoded.errors['violation']) == [2]
+
+
+def test_flags_missing_mid_bit_transition():
+    rng = random.Random(7)
+    data = random_bits(rng, 64)
+    levels = np.array(reference_levels('Manchester', data, 2), dtype=np.int8)
+    levels[21] = levels[20]
+    assert list(decode('Manchester', levels).errors['mid-bit']) == [10]
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+import struct
+
+import numpy as np
+import pytest
+
+import encode_cli
+from encode_cli import encode_file, output_names
+
+
+def test_colliding_stems_keep_the_file_name():
+    assert output_names(['in.txt', 'in.bin', 'other.bin']) == {
+        'in.txt': 'in.txt', 'in.bin': 'in.bin', 'other.bin': 'other'
+    }
+
+
+@pytest.mark.parametrize('files', (['a/cap.bin', 'b/cap.bin'], ['in.txt', 'in.txt']))
+def test_shared_outputs_are_rejected(files):
+    with pytest.raises(ValueError):
+        output_names(files)
+
+
+def test_failed_job_keeps_existing_output(tmp_path):
+    good, bad = tmp_path / 'good.txt', tmp_path / 'bad.txt'
+    good.write_text('0100001')
+    bad.write_text('01x')
+    out_path = str(tmp_path / 'out.hdb3.npy')
+    encode_file(str(good), 'HDB3', out_path, fmt='npy')
+    with pytest.raises(ValueError):
+        encode_file(str(bad), 'HDB3', out_path, fmt='npy')
+    assert list(np.load(out_path)) == [0, 1, 0, 0, 0, 1, -1]
+    # No partial file left behind either
+    assert sorted(os.listdir(tmp_path)) == ['bad.txt', 'good.txt', 'out.hdb3.npy']
+
+
+@pytest.mark.parametrize('error', [struct.error('argument out of range'), MemoryError(), BrokenProcessPool()])
+def test_any_job_failure_is_counted(tmp_path, monkeypatch, capsys, error):
+    files = []
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        (tmp_path / name).write_text('0110')
+        files.append(str(tmp_path / name))
+
+    def encode_or_fail(path, *args):
+        if path.endswith('b.txt'):
+            raise error
+        return encode_file(path, *args)
+
+    # Threads, so the failing job can be injected
+    monkeypatch.setattr(encode_cli, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(encode_cli, 'encode_file', encode_or_fail)
+    status = encode_cli.main(files + ['-s', 'AMI', '-s', 'NRZ-L', '-o', str(tmp_path / 'out'), '-j', '2'])
+    out, err = capsys.readouterr()
+    assert status == 1
+    assert '4/6 jobs' in out
+    assert err.count('b.txt') == 2
+    assert sorted(os.listdir(tmp_path / 'out')) == ['a.ami.i8', 'a.nrz-l.i8', 'c.ami.i8', 'c.nrz-l.i8']
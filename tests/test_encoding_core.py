@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+
+import byte_tables
+from encoding_core import SCHEMES, encode, encode_stream, to_bits
+from encoding_logic import EncodingLogic
+from reference import METHODS, ReferenceLogic, random_bits, reference_points, sample_inputs
+
+INPUTS = sample_inputs()
+
+
+def assert_points_equal(points, expected):
+    x, y = points
+    ex, ey = expected
+    assert np.array_equal(np.asarray(x, dtype=np.float64), np.array(ex, dtype=np.float64))
+    assert np.array_equal(np.asarray(y), np.array(ey))
+
+
+def pack(data):
+    """`data` as MSB-first packed bytes, zero-padded to a whole byte."""
+    bits = np.frombuffer(data.encode('ascii'), dtype=np.uint8) - ord('0')
+    return np.packbits(bits).tobytes()
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_encode_matches_reference(scheme):
+    for data in INPUTS:
+        assert_points_equal(encode(scheme, data), reference_points(scheme, data))
+
+
+@pytest.mark.parametrize('data', ['0102', '01 1', 'a', '0\u00e91', '1\n', [0, 1, 2], np.array([1, -1])])
+def test_non_bit_input_is_rejected(data):
+    with pytest.raises(ValueError):
+        to_bits(data)
+    with pytest.raises(ValueError):
+        encode('AMI', data)
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_byte_tables_match_reference(scheme):
+    for data in INPUTS:
+        assert_points_equal(byte_tables.encode(scheme, data), reference_points(scheme, data))
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_packed_input_matches_string_input(scheme):
+    for data in INPUTS:
+        padded = data + '0' * (-len(data) % 8)
+        assert_points_equal(encode(scheme, pack(data)), encode(scheme, padded))
+
+
+def test_logic_matches_reference_across_calls():
+    # The AMI polarity carries from one call to the next; B8ZS/HDB3 restart
+    # from -1 and leave it at their last pulse.
+    rng = random.Random(1)
+    logic, reference = EncodingLogic(), ReferenceLogic()
+    for _ in range(300):
+        scheme = rng.choice(SCHEMES)
+        data = rng.choice(INPUTS)
+        name = METHODS[scheme]
+        assert_points_equal(getattr(logic, name)(data), getattr(reference, name)(data))
+        assert logic.last_pulse_polarity == reference.last_pulse_polarity, (scheme, data)
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_encode_stream_random_chunks(scheme):
+    rng = random.Random(2)
+    for data in INPUTS + [random_bits(rng, 5000, 0.1)]:
+        cuts = sorted(rng.sample(range(len(data) + 1), min(len(data) + 1, rng.randint(0, 12))))
+        chunks = [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+        segments = list(encode_stream(scheme, chunks))
+        x = np.concatenate([segment[0] for segment in segments])
+        y = np.concatenate([segment[1] for segment in segments])
+        assert_points_equal((x, y), reference_points(scheme, data))
+
+
+@pytest.mark.parametrize('scheme', ['B8ZS', 'HDB3'])
+def test_substitution_on_long_zero_runs(scheme):
+    # Every run length up to several blocks, runs of thousands of bits, and
+    # runs at both ends, after an AMI call has moved the carried polarity.
+    rng = random.Random(3)
+    runs = list(range(41)) + [255, 256, 1000, 4097]
+    rng.shuffle(runs)
+    inputs = [
+        ''.join('0' * run + '1' * rng.randint(1, 3) for run in runs),
+        '0' * 10000,
+        '0' * 4099 + '1' + '0' * 8193,
+    ]
+    logic, reference = EncodingLogic(), ReferenceLogic()
+    for data in inputs:
+        logic.get_ami('1')
+        reference.get_ami('1')
+        name = METHODS[scheme]
+        assert_points_equal(getattr(logic, name)(data), getattr(reference, name)(data))
+        assert logic.last_pulse_polarity == reference.last_pulse_polarity
@@ -0,0 +1,95 @@
+import wave
+
+import numpy as np
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, encode_levels
+from exporters import WAV_AMPLITUDE, WRITERS, LevelWriter, NpyWriter, WavWriter, export
+from packed_bits import PackedBits
+
+CASES = [('NRZ-L', None), ('Manchester', None), ('HDB3', 3), ('Differential Manchester', 4), ('B8ZS', 1)]
+
+
+def bit_chunks(seed=2):
+    rng = np.random.default_rng(seed)
+    chunks = [rng.integers(0, 2, n, dtype=np.uint8) for n in (0, 5, 64, 1, 200)]
+    # Zero runs across chunk boundaries exercise the held-back bits
+    chunks[2][-9:] = 0
+    chunks[3][:] = 0
+    return chunks
+
+
+def expected_samples(scheme, chunks, samples_per_bit):
+    levels = encode_levels(scheme, np.concatenate(chunks))
+    return np.repeat(levels, (samples_per_bit or SAMPLES_PER_BIT[scheme]) // SAMPLES_PER_BIT[scheme])
+
+
+def read_vcd(path):
+    """Samples of the single signal, from its value changes and end time."""
+    values = {'b1': 1, 'b0': 0, 'b11': -1}
+    samples, time, level = [], None, None
+    with open(path) as f:
+        body = f.read().split('$enddefinitions $end\n')[1]
+    for line in body.split():
+        if line.startswith('#'):
+            now = int(line[1:])
+            if time is not None:
+                samples.extend([level] * (now - time))
+            time = now
+        elif line != '!':
+            level = values[line]
+    return np.array(samples, dtype=np.int8)
+
+
+def read_wav(path):
+    with wave.open(str(path), 'rb') as f:
+        assert (f.getnchannels(), f.getsampwidth()) == (1, 2)
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+    return (pcm // int(WAV_AMPLITUDE * 32767)).astype(np.int8)
+
+
+READERS = {
+    '.i8': lambda path: np.fromfile(path, dtype=np.int8),
+    '.npy': lambda path: np.load(path, mmap_mode='r'),
+    '.vcd': read_vcd,
+    '.wav': read_wav,
+}
+
+
+@pytest.mark.parametrize('suffix', sorted(WRITERS))
+@pytest.mark.parametrize('scheme, samples_per_bit', CASES)
+def test_round_trip(tmp_path, suffix, scheme, samples_per_bit):
+    chunks = bit_chunks()
+    path = tmp_path / f'out{suffix}'
+    bits = export(scheme, chunks, WRITERS[suffix](str(path), scheme, samples_per_bit))
+    assert bits == sum(map(len, chunks))
+    assert np.array_equal(READERS[suffix](path), expected_samples(scheme, chunks, samples_per_bit))
+
+
+def test_npy_header_is_patched(tmp_path):
+    path = tmp_path / 'out.npy'
+    export('AMI', PackedBits(bytes(range(40))), NpyWriter(str(path), 'AMI'))
+    array = np.load(path)
+    assert array.dtype == np.int8 and array.shape == (320,)
+
+
+def test_wav_over_the_riff_limit_is_refused_up_front(tmp_path, monkeypatch):
+    monkeypatch.setattr(WavWriter, 'max_samples', 100)
+    path = tmp_path / 'out.wav'
+    with pytest.raises(ValueError):
+        export('NRZ-L', PackedBits(bytes(13)), WavWriter(str(path), 'NRZ-L'))
+    assert read_wav(path).size == 0
+    # Unknown length: refused at the first chunk that does not fit
+    with pytest.raises(ValueError):
+        export('NRZ-L', [np.ones(60, dtype=np.uint8)] * 2, WavWriter(str(path), 'NRZ-L'))
+    assert np.array_equal(read_wav(path), -np.ones(60, dtype=np.int8))
+
+
+def test_samples_per_bit_must_be_a_multiple(tmp_path):
+    with pytest.raises(ValueError):
+        WRITERS['.i8'](str(tmp_path / 'out.i8'), 'Manchester', 3)
+
+
+def test_level_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        LevelWriter(str(tmp_path / 'out.i8'), 'AMI')
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, START_LEVELS
+from incremental import IncrementalEncoder
+from reference import random_bits, reference_levels
+from waveform import Waveform
+
+
+def edit(rng, data):
+    """A random replacement, insertion or deletion, as typing makes them."""
+    at = rng.randint(0, len(data))
+    size = rng.choice((1, 1, 1, 4, 8, 20))
+    kind = rng.choice(('replace', 'insert', 'delete'))
+    text = random_bits(rng, size, rng.choice((0.0, 0.5)))
+    if kind == 'replace':
+        return data[:at] + text + data[at + size:]
+    if kind == 'insert':
+        return data[:at] + text + data[at:]
+    return data[:at] + data[at + size:]
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_edits_match_full_encode(scheme):
+    rng = random.Random(3)
+    # A short checkpoint interval so edits resume and converge mid-input
+    encoder = IncrementalEncoder(scheme, interval=16)
+    data = random_bits(rng, 600, 0.2)
+    for _ in range(150):
+        data = edit(rng, data)
+        levels = encoder.update(data)
+        expected = reference_levels(scheme, data, SAMPLES_PER_BIT[scheme])
+        assert np.array_equal(levels, expected), data
+        assert len(encoder.bits) == len(data)
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_waveform_matches_reference(scheme):
+    rng = random.Random(4)
+    encoder = IncrementalEncoder(scheme, interval=8)
+    data = random_bits(rng, 200, 0.3)
+    for _ in range(40):
+        data = edit(rng, data)
+        spb = SAMPLES_PER_BIT[scheme]
+        expected = Waveform.from_levels(np.array(reference_levels(scheme, data, spb)), spb, START_LEVELS[scheme])
+        waveform = encoder.waveform(data)
+        assert np.array_equal(waveform.times, expected.times)
+        assert np.array_equal(waveform.levels, expected.levels)
+        assert waveform.end == len(data)
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, encode_levels, encode_waveform
+from encoding_logic import EncodingLogic
+from line_stats import line_stats
+from reference import random_bits, sample_inputs
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_waveform_to_levels_round_trip(scheme):
+    for data in sample_inputs(count=20, seed=8):
+        waveform = encode_waveform(scheme, data)
+        levels = waveform.to_levels(SAMPLES_PER_BIT[scheme])
+        assert len(levels) == len(data) * SAMPLES_PER_BIT[scheme]
+        assert list(levels) == list(encode_levels(scheme, data))
+
+
+def test_logic_stats_match_a_fresh_encode():
+    # Edits go through the incremental encoder, switching back to an input
+    # through the waveform cache; the statistics must not depend on which.
+    rng = random.Random(9)
+    logic = EncodingLogic()
+    inputs = [random_bits(rng, 3000, 0.2) for _ in range(3)]
+    for data in inputs + inputs[:1]:
+        for scheme in SCHEMES:
+            logic.get_waveform(scheme, data)
+        expected = {scheme: line_stats(scheme, data).summary() for scheme in SCHEMES}
+        assert logic.get_all_stats(data) == expected
+        logic.stats_digest = None
+        assert {scheme: logic.get_stats(scheme, data) for scheme in SCHEMES} == expected
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, to_bits
+from live_stream import LiveStream, parse_address
+from reference import reference_levels
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('tcp://127.0.0.1:5555', ('tcp', ('127.0.0.1', 5555))),
+    ('tcp://:7000', ('tcp', ('127.0.0.1', 7000))),
+    ('unix:/tmp/line.sock', ('unix', '/tmp/line.sock')),
+])
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize('address', ['bogus', 'tcp://host', 'tcp://host:port', 'udp://127.0.0.1:5555'])
+def test_bad_address_raises_on_the_callers_thread(address):
+    with pytest.raises(ValueError):
+        LiveStream('AMI', address)
+
+
+def test_failed_start_sets_error_and_stop_is_a_no_op(tmp_path):
+    stream = LiveStream('AMI', f'unix:{tmp_path}/missing/line.sock').start(timeout=1.0)
+    assert isinstance(stream.error, OSError)
+    assert stream.ready.is_set()
+    stream.stop()
+    stream.stop()
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_window_matches_reference(scheme):
+    rng = np.random.default_rng(3)
+    data = rng.integers(0, 256, 96, dtype=np.uint8).tobytes()
+    stream = LiveStream(scheme, window_bits=100)
+    for start in range(0, len(data), 7):
+        stream.feed(data[start:start + 7])
+    spb = SAMPLES_PER_BIT[scheme]
+    # Zeros B8ZS and HDB3 hold back are not in the window yet
+    emitted = len(data) * 8 - stream.encoder.state.pending_zeros
+    expected = reference_levels(scheme, ''.join(map(str, to_bits(data))), spb)[:emitted * spb]
+    assert np.array_equal(stream.window, expected[-100 * spb:])
+    assert stream.start_level == expected[-100 * spb - 1]
+
+
+@pytest.mark.parametrize('first, second', [('B8ZS', 'NRZ-L'), ('HDB3', 'B8ZS'), ('AMI', 'HDB3')])
+def test_set_scheme_carries_held_bits(first, second):
+    rng = np.random.default_rng(5)
+    head = rng.integers(0, 256, 20, dtype=np.uint8).tobytes() + bytes([0xF0])
+    tail = rng.integers(0, 256, 20, dtype=np.uint8).tobytes()
+    stream = LiveStream(first, window_bits=1000)
+    stream.feed(head)
+    held = stream.encoder.state.pending_zeros
+    stream.set_scheme(second)
+    assert stream.scheme == second and len(stream.window) == 0
+    stream.feed(tail)
+    assert stream.encoder.position + stream.encoder.state.pending_zeros == len(head + tail) * 8
+    bits = '0' * held + ''.join(map(str, to_bits(tail)))
+    emitted = len(bits) - stream.encoder.state.pending_zeros
+    spb = SAMPLES_PER_BIT[second]
+    assert np.array_equal(stream.window, reference_levels(second, bits, spb)[:emitted * spb])
+    stream.publish()
+    frame = stream.frames.take()
+    assert frame.scheme == second and frame.position == stream.encoder.position
+
+
+async def send(address, *parts, pause=0.05):
+    """Connects to `address` and writes `parts` with a pause after each."""
+    reader, writer = await asyncio.open_unix_connection(address[len('unix:'):])
+    for part in parts:
+        writer.write(part)
+        await writer.drain()
+        await asyncio.sleep(pause)
+    writer.close()
+    await writer.wait_closed()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_encode_failure_ends_the_service(tmp_path):
+    address = f'unix:{tmp_path}/line.sock'
+    stream = LiveStream('AMI', address).start()
+    assert stream.error is None
+
+    def fail(data):
+        raise RuntimeError('encoder failed')
+
+    stream.feed = fail
+    asyncio.run(send(address, b'\x55' * 64))
+    wait_for(lambda: not stream._thread.is_alive())
+    assert isinstance(stream.error, RuntimeError)
+    stream.stop()
+
+
+def test_senders_are_read_one_at_a_time(tmp_path):
+    address = f'unix:{tmp_path}/line.sock'
+    stream = LiveStream('Unipolar', address, window_bits=1 << 12).start()
+    first, second, late = b'\xff' * 40, b'\x0f' * 40, b'\x00' * 40
+
+    async def later():
+        # Connects while the first sender is still sending
+        await asyncio.sleep(0.1)
+        await send(address, second, pause=0)
+
+    async def overlap():
+        await asyncio.gather(send(address, first, late, pause=0.3), later())
+
+    try:
+        asyncio.run(overlap())
+        wait_for(lambda: stream.encoder.position == 8 * 120)
+        assert np.array_equal(stream.window, to_bits(first + late + second))
+    finally:
+        stream.stop()
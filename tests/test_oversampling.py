@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, encode_levels
+from oversampling import UniformSignal, memory_estimate, oversample
+
+SLICES = [
+    slice(None), slice(3, 17), slice(5, 6), slice(7, 7), slice(-9, None), slice(None, -4),
+    slice(1, 40, 3), slice(None, None, 5), slice(None, None, -1), slice(10, 2, -1),
+    slice(None, 3, -2), slice(-1, -30, -7), slice(2, 10, -1), slice(-1000, 1000),
+    slice(1000, -1000, -3),
+]
+
+
+@pytest.fixture(params=[('NRZ-L', 4), ('Manchester', 2), ('Manchester', 6), ('HDB3', 1)])
+def signal(request):
+    scheme, samples_per_bit = request.param
+    data = np.random.default_rng(1).integers(0, 2, 23, dtype=np.uint8)
+    levels = encode_levels(scheme, data)
+    native = SAMPLES_PER_BIT[scheme]
+    return oversample(scheme, data, samples_per_bit), np.repeat(levels, samples_per_bit // native)
+
+
+@pytest.mark.parametrize('index', SLICES, ids=str)
+def test_slices_match_repeat(signal, index):
+    uniform, expected = signal
+    assert np.array_equal(uniform[index], expected[index])
+
+
+def test_integer_indices(signal):
+    uniform, expected = signal
+    assert len(uniform) == len(expected)
+    for i in [0, 1, len(expected) - 1, -1, -len(expected)]:
+        assert uniform[i] == expected[i]
+    for i in [len(expected), -len(expected) - 1]:
+        with pytest.raises(IndexError):
+            uniform[i]
+
+
+def test_chunks_cover_every_sample(signal):
+    uniform, expected = signal
+    for max_samples in (1, 5, 64, 1 << 20):
+        blocks = list(uniform.chunks(max_samples, dtype=np.float32))
+        assert all(len(block) <= max(max_samples, uniform.repeat) for block in blocks)
+        assert np.array_equal(np.concatenate(blocks), expected.astype(np.float32))
+
+
+def test_to_array_budget(signal):
+    uniform, expected = signal
+    assert np.array_equal(uniform.to_array(), expected)
+    needed = memory_estimate(uniform.nbits, uniform.samples_per_bit, np.float64)
+    assert np.array_equal(uniform.to_array(np.float64, budget=needed), expected)
+    with pytest.raises(MemoryError):
+        uniform.to_array(np.float64, budget=needed - 1)
+
+
+def test_rate_must_be_a_multiple_of_the_native_rate():
+    with pytest.raises(ValueError):
+        UniformSignal(np.zeros(4, dtype=np.int8), 2, 3)
+    with pytest.raises(ValueError):
+        UniformSignal(np.zeros(4, dtype=np.int8), 1, 65)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import parallel_encode
+from encoding_core import SCHEMES, encode_waveform
+from packed_bits import PackedBits
+from parallel_encode import SchemePool
+
+
+def inputs():
+    rng = np.random.default_rng(4)
+    packed = rng.integers(0, 256, 300, dtype=np.uint8).tobytes()
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8))
+    lsb = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), bitorder='little')
+    return [
+        (''.join(map(str, bits[:2001])), bits[:2001]),
+        (packed, bits),
+        (PackedBits(packed, nbits=2397), bits[:2397]),
+        (PackedBits(packed, 'lsb', nbits=1003), lsb[:1003]),
+    ]
+
+
+def assert_encoded(results, bits, schemes):
+    assert sorted(results) == sorted(schemes)
+    for scheme in schemes:
+        expected = encode_waveform(scheme, bits)
+        assert np.array_equal(results[scheme].times, expected.times)
+        assert np.array_equal(results[scheme].levels, expected.levels)
+        assert results[scheme].end == expected.end
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = SchemePool(workers=2, min_bits=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_matches_in_process_encoding(pool, monkeypatch):
+    monkeypatch.setattr(parallel_encode, 'available_cpus', lambda: 2)
+    for data, bits in inputs():
+        assert_encoded(pool.encode_all(data, ['AMI', 'HDB3', 'Manchester']), bits, ['AMI', 'HDB3', 'Manchester'])
+    if pool.unavailable:
+        pytest.skip("no process pool on this platform")
+    assert pool._executor is not None
+
+
+@pytest.mark.parametrize('cpus, min_bits', [(1, 0), (4, 1 << 30)])
+def test_single_cpu_or_small_input_stays_in_process(monkeypatch, cpus, min_bits):
+    monkeypatch.setattr(parallel_encode, 'available_cpus', lambda: cpus)
+    pool = SchemePool(workers=4, min_bits=min_bits)
+    for data, bits in inputs():
+        assert_encoded(pool.encode_all(data), bits, SCHEMES)
+    assert pool._executor is None
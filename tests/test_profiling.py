@@ -0,0 +1,34 @@
+import threading
+
+from profiling import StageProfiler
+
+
+def test_overlapping_stages_share_allocation_tracking():
+    profiler = StageProfiler('test')
+    profiler.set_enabled(True)
+    try:
+        first, second = profiler.frame('first'), profiler.frame('second')
+        entered, done = threading.Event(), threading.Event()
+
+        def other():
+            with second.stage('encode'):
+                entered.set()
+                done.wait(5)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        entered.wait(5)
+        with first.stage('draw'):
+            data = bytearray(1 << 20)
+        done.set()
+        thread.join()
+        with first.stage('layout'):
+            pass
+    finally:
+        profiler.set_enabled(False)
+
+    measured, unmeasured = second.stages[0], first.stages[0]
+    assert measured['alloc_bytes'] is not None and measured['overlapped']
+    assert unmeasured['alloc_bytes'] is None and unmeasured['overlapped']
+    assert first.stages[1]['alloc_bytes'] is not None and not first.stages[1]['overlapped']
+    assert len(data) == 1 << 20
@@ -0,0 +1,102 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from encoding_core import SAMPLES_PER_BIT, SCHEMES, START_LEVELS
+from packed_bits import PackedBits
+from reference import ZERO_RUNS, random_bits, reference_levels
+from encoding_logic import EncodingLogic
+from seek_index import CaptureIndex, SeekableCapture, build_index, index_paths, open_capture
+
+
+def capture(data):
+    bits = np.frombuffer(data.encode('ascii'), dtype=np.uint8) - ord('0')
+    return PackedBits(np.packbits(bits).tobytes(), nbits=len(data))
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_windows_match_reference(scheme):
+    rng = random.Random(5)
+    # Zero runs straddling checkpoints and window edges
+    data = ''.join(random_bits(rng, rng.randint(0, 9), 0.6) + '0' * rng.choice(ZERO_RUNS) for _ in range(80))
+    bits = capture(data)
+    seekable = SeekableCapture(bits, build_index(bits, interval=32))
+    spb = SAMPLES_PER_BIT[scheme]
+    expected = np.array(reference_levels(scheme, data, spb), dtype=np.int8)
+    windows = [(0, 0), (0, 1), (0, len(data)), (len(data) - 1, 5), (len(data), 4)]
+    windows += [(rng.randint(0, len(data)), rng.randint(0, 100)) for _ in range(100)]
+    for start, width in windows:
+        levels, before = seekable.window_levels(scheme, start, width)
+        stop = min(start + width, len(data))
+        assert np.array_equal(levels, expected[start * spb:stop * spb]), (start, width)
+        assert before == (expected[start * spb - 1] if start else START_LEVELS[scheme]), (start, width)
+
+
+def test_empty_capture(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    seekable = open_capture(str(path), interval=32)
+    assert len(seekable) == 0
+    for scheme in SCHEMES:
+        levels, before = seekable.window_levels(scheme, 0, 10)
+        assert len(levels) == 0 and before == START_LEVELS[scheme]
+        assert len(seekable.window(scheme, 5, 10).to_levels(SAMPLES_PER_BIT[scheme])) == 0
+
+
+def test_side_car_falls_back_to_the_cache_directory(tmp_path, monkeypatch):
+    captures = tmp_path / 'captures'
+    captures.mkdir()
+    path = captures / 'cap.bin'
+    path.write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    saved = []
+    original_save = CaptureIndex.save
+
+    def save(index, where):
+        saved.append(where)
+        # The capture's own directory is read-only
+        if os.path.dirname(where) == str(captures):
+            raise PermissionError(where)
+        original_save(index, where)
+
+    monkeypatch.setattr(CaptureIndex, 'save', save)
+    first = open_capture(str(path), interval=64)
+    side_car, cached = index_paths(str(path))
+    assert saved == [side_car, cached] and os.path.exists(cached)
+    # Reused from the cache on the next open
+    saved.clear()
+    second = open_capture(str(path), interval=64)
+    assert saved == []
+    assert np.array_equal(second.index.states['HDB3'], first.index.states['HDB3'])
+
+
+def test_index_kept_in_memory_when_nothing_is_writable(tmp_path, monkeypatch):
+    path = tmp_path / 'cap.bin'
+    path.write_bytes(bytes(range(256)))
+
+    def refuse(index, where):
+        raise PermissionError(where)
+
+    monkeypatch.setattr(CaptureIndex, 'save', refuse)
+    seekable = open_capture(str(path), interval=64)
+    assert seekable.index.nbits == 2048
+
+
+def test_logic_windows_from_the_open_capture(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    rng = random.Random(6)
+    data = random_bits(rng, 4000, 0.3)
+    path = tmp_path / 'cap.bin'
+    path.write_bytes(np.packbits(np.frombuffer(data.encode('ascii'), dtype=np.uint8) - ord('0')).tobytes())
+    logic = EncodingLogic()
+    with pytest.raises(ValueError):
+        logic.get_window('AMI', 0, 10)
+    logic.open_capture(str(path), nbits=len(data))
+    for scheme in ('NRZ-I', 'HDB3', 'Manchester'):
+        spb = SAMPLES_PER_BIT[scheme]
+        expected = np.array(reference_levels(scheme, data, spb), dtype=np.int8)
+        waveform = logic.get_window(scheme, 1500, 300)
+        assert (waveform.start, waveform.end) == (1500, 1800)
+        assert np.array_equal(waveform.to_levels(spb), expected[1500 * spb:1800 * spb])
@@ -0,0 +1,237 @@
+"""
+Transition-only waveform representation shared by the encoders and viewers.
+
+A `Waveform` stores only the times at which the level changes and the level
+held from each of those times on, instead of two or four duplicated (x, y)
+breakpoints per bit. Long runs of a constant level cost one entry no matter
+how many bits they span.
+"""
+import numpy as np
+
+TIME_DTYPE = np.float64
+LEVEL_DTYPE = np.int8
+
+
+def grid_step(bits_length, width, min_spacing):
+    """
+    Smallest 1-2-5 multiple of one bit whose grid lines end up at least
+    `min_spacing` pixels apart when `bits_length` bits span `width` pixels.
+    """
+    needed = min_spacing * bits_length / max(1.0, width)
+    decade = 1
+    while True:
+        for factor in (1, 2, 5):
+            if factor * decade >= needed:
+                return factor * decade
+        decade *= 10
+
+
+class Waveform:
+    """
+    Piecewise-constant signal.
+    - times: start time (in bit intervals) of each constant segment, increasing.
+    - levels: level of each segment.
+    - end: time at which the last segment ends.
+    - start_level: level just before the first segment (the encoders'
+      leading point); for a window of a longer signal, the level before it.
+    """
+    __slots__ = ('times', 'levels', 'end', 'start_level')
+
+    def __init__(self, times, levels, end, start_level=0):
+        self.times = np.asarray(times, dtype=TIME_DTYPE)
+        self.levels = np.asarray(levels, dtype=LEVEL_DTYPE)
+        self.end = float(end)
+        self.start_level = int(start_level)
+
+    @classmethod
+    def from_levels(cls, levels, samples_per_bit=1, start_level=0, offset=0):
+        """
+        Builds a waveform from uniformly spaced levels (`samples_per_bit` per
+        bit), keeping only the samples where the level changes.
+        """
+        levels = np.asarray(levels)
+        if len(levels):
+            edges = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+            index = np.concatenate(([0], edges))
+        else:
+            index = np.zeros(0, dtype=np.intp)
+        step = 1.0 / samples_per_bit
+        times = offset + index * step
+        end = offset + len(levels) * step
+        return cls(times, levels[index], end, start_level)
+
+    def __len__(self):
+        return len(self.times)
+
+    def to_levels(self, samples_per_bit=1):
+        """Inverse of `from_levels()`: the uniformly spaced levels from `start` to `end`."""
+        bounds = np.round((np.append(self.times, self.end) - self.start) * samples_per_bit).astype(np.intp)
+        return np.repeat(self.levels, np.diff(bounds))
+
+    @property
+    def start(self):
+        return float(self.times[0]) if len(self.times) else self.end
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.levels.nbytes
+
+    def distinct_levels(self):
+        """Sorted levels the signal takes, including the leading point."""
+        return np.unique(np.append(self.levels, self.start_level)).tolist()
+
+    def max_abs_level(self):
+        """Largest absolute level, including the leading point."""
+        if not len(self.levels):
+            return abs(self.start_level)
+        return max(abs(self.start_level), -int(self.levels.min()), int(self.levels.max()))
+
+    def step_arrays(self):
+        """
+        Breakpoints for a `where='post'` step plot: one per segment start plus
+        one at `end`, preceded by the leading (start, start_level) point.
+        """
+        x = np.concatenate(([self.start], self.times, [self.end]))
+        last = self.levels[-1:] if len(self.levels) else [self.start_level]
+        y = np.concatenate(([self.start_level], self.levels, last)).astype(LEVEL_DTYPE)
+        return x, y
+
+    def decimate(self, columns, t0=None, t1=None):
+        """
+        Min/max level-of-detail reduction of the span [t0, t1) to `columns`
+        pixel columns, returned as `(x, y)` polyline arrays.
+
+        Every column that contains edges becomes one vertical stroke at its
+        first edge, running from the level entering the column through the
+        lowest and highest levels inside it to the level leaving it. No edge
+        is ever dropped, and a column with a single edge is drawn exactly.
+        The result has at most 4 * columns + 2 points whatever the input size.
+        """
+        if t0 is None:
+            t0 = self.start
+        if t1 is None:
+            t1 = self.end
+        columns = max(1, int(columns))
+        lo = np.searchsorted(self.times, t0, side='left')
+        hi = np.searchsorted(self.times, t1, side='left')
+        entering = int(self.levels[lo - 1]) if lo > 0 else self.start_level
+        times = self.times[lo:hi]
+        levels = self.levels[lo:hi]
+        if not len(times) or t1 <= t0:
+            return (np.array([t0, t1], dtype=TIME_DTYPE),
+                    np.array([entering, entering], dtype=LEVEL_DTYPE))
+
+        # Index of the first edge in each column; only the non-empty
+        # columns are kept.
+        bounds = t0 + np.arange(columns + 1) * ((t1 - t0) / columns)
+        first = np.searchsorted(times, bounds, side='left')
+        first[-1] = len(times)
+        starts = first[:-1][first[:-1] < first[1:]]
+        ends = np.concatenate((starts[1:], [len(times)])) - 1
+
+        # Level in force just before each column's first edge.
+        before = np.where(starts > 0, levels[starts - 1], entering)
+
+        n = len(starts)
+        x = np.empty(4 * n + 2, dtype=TIME_DTYPE)
+        y = np.empty(4 * n + 2, dtype=LEVEL_DTYPE)
+        x[0], y[0] = t0, entering
+        x[1:-1] = np.repeat(times[starts], 4)
+        y[1:-1:4] = before
+        y[2:-1:4] = np.minimum(np.minimum.reduceat(levels, starts), before)
+        y[3:-1:4] = np.maximum(np.maximum.reduceat(levels, starts), before)
+        y[4:-1:4] = levels[ends]
+        x[-1], y[-1] = t1, levels[-1]
+        return x, y
+
+    def envelope(self, columns, t0=None, t1=None):
+        """
+        Lowest and highest level over each of `columns` equal slices of
+        [t0, t1), for drawing the signal as a filled band one pixel column
+        per slice. Returns `(bounds, lo, hi)` with `columns + 1` slice bounds.
+        The leading point counts towards the first slice.
+        """
+        if t0 is None:
+            t0 = self.start
+        if t1 is None:
+            t1 = self.end
+        columns = max(1, int(columns))
+        bounds = t0 + np.arange(columns + 1) * ((t1 - t0) / columns)
+        if not len(self.times):
+            lo = np.full(columns, self.start_level, dtype=LEVEL_DTYPE)
+            return bounds, lo, lo.copy()
+
+        # Edges in slice c are those with bounds[c] < time <= bounds[c + 1];
+        # edges at or after t1 are left out.
+        at = np.searchsorted(self.times, bounds, side='right')
+        levels = self.levels[:at[-1]]
+        in_force = np.where(at[:-1] > 0, self.levels[np.maximum(at[:-1] - 1, 0)], self.start_level)
+        lo = in_force.astype(LEVEL_DTYPE)
+        hi = lo.copy()
+        busy = at[:-1] < at[1:]
+        starts = at[:-1][busy]
+        if len(starts):
+            lo[busy] = np.minimum(lo[busy], np.minimum.reduceat(levels, starts))
+            hi[busy] = np.maximum(hi[busy], np.maximum.reduceat(levels, starts))
+        if t0 <= self.start:
+            lo[0] = min(lo[0], self.start_level)
+            hi[0] = max(hi[0], self.start_level)
+        return bounds, lo, hi
+
+    @property
+    def points(self):
+        """Lazy view of the full polyline: the leading point, then two per segment."""
+        return PointsView(self)
+
+
+class PointsView:
+    """
+    Read-only sequence of `(x, y)` polyline points expanded from a `Waveform`
+    on access. Nothing is materialised until `arrays()` or `tolist()`.
+    """
+    __slots__ = ('waveform',)
+
+    def __init__(self, waveform):
+        self.waveform = waveform
+
+    def __len__(self):
+        return 1 + 2 * len(self.waveform)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('point index out of range')
+        wf = self.waveform
+        if i == 0:
+            return wf.start, wf.start_level
+        segment, second = divmod(i - 1, 2)
+        if second:
+            x = wf.times[segment + 1] if segment + 1 < len(wf) else wf.end
+        else:
+            x = wf.times[segment]
+        return float(x), int(wf.levels[segment])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def arrays(self):
+        """Materialises the polyline as `(x, y)` arrays."""
+        wf = self.waveform
+        n = len(wf)
+        x = np.empty(1 + 2 * n, dtype=TIME_DTYPE)
+        y = np.empty(1 + 2 * n, dtype=LEVEL_DTYPE)
+        x[0], y[0] = wf.start, wf.start_level
+        x[1::2] = wf.times
+        x[2:-1:2] = wf.times[1:]
+        if n:
+            x[-1] = wf.end
+        y[1::2] = wf.levels
+        y[2::2] = wf.levels
+        return x, y
+
+    def tolist(self):
+        x, y = self.arrays()
+        return x.tolist(), y.tolist()